@@ -0,0 +1,151 @@
+"""Shared helpers for the Smart Workday benchmarks.
+
+The benchmarks exercise the real integration code (Home Assistant must be
+installed) but never start a Home Assistant instance: ``FakeHass`` provides
+only the attributes the data manager and calendar entity touch.
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIRST_YEAR = 1990
+YEARS = 50
+
+_HOLIDAY_NAMES = ["元旦", "春节", "清明节", "劳动节", "端午节", "中秋节", "国庆节"]
+_CUSTOM_NAMES = ["植树节", "母亲节", "儿童节", "公司年会", "团建日"]
+_STUDENT_NAMES = ["寒假", "暑假", "秋假", "春假"]
+
+
+class FakeHass:
+    """Minimal stand-in for HomeAssistant used by the benchmarks."""
+
+    def __init__(self, config_dir: str):
+        self.config = SimpleNamespace(path=lambda *parts: os.path.join(config_dir, *parts))
+        self.data: Dict = {}
+
+    async def async_add_executor_job(self, target, *args):
+        """Run the job inline; the benchmarks measure the job itself."""
+        return target(*args)
+
+
+def synthetic_calendar(entries: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    """生成指定条目数的日历：60% 单天事件，40% 范围事件，分布在 YEARS 年内"""
+    rng = random.Random(seed)
+    first = date(FIRST_YEAR, 1, 1)
+    span = (date(FIRST_YEAR + YEARS, 1, 1) - first).days
+    data: Dict[str, List[Dict]] = {"holidays": [], "customdays": [], "studentdays": []}
+    for _ in range(entries):
+        start = first + timedelta(days=rng.randrange(span))
+        roll = rng.random()
+        if roll < 0.6:
+            section = "holidays" if roll < 0.45 else "customdays"
+            names = _HOLIDAY_NAMES if section == "holidays" else _CUSTOM_NAMES
+            name = rng.choice(names) + ("调休" if section == "holidays" and rng.random() < 0.2 else "")
+            data[section].append({"date": start.isoformat(), "name": name})
+        elif roll < 0.9:
+            end = start + timedelta(days=rng.randint(1, 9))
+            data["holidays"].append({
+                "start": start.isoformat(), "end": end.isoformat(), "name": rng.choice(_HOLIDAY_NAMES),
+            })
+        else:
+            end = start + timedelta(days=rng.randint(7, 60))
+            data["studentdays"].append({
+                "start": start.isoformat(), "end": end.isoformat(), "name": rng.choice(_STUDENT_NAMES),
+            })
+    return data
+
+
+# 常见周期规则条目（公历固定日期、第几个星期几、农历日期）
+SAMPLE_RULES: Dict[str, List[Dict]] = {
+    "holidays": [
+        {"rule": "fixed", "month": 1, "day": 1, "name": "元旦"},
+        {"rule": "lunar", "month": 12, "day": -1, "name": "除夕"},
+        {"rule": "lunar", "month": 1, "day": 1, "days": 3, "name": "春节"},
+        {"rule": "lunar", "month": 5, "day": 5, "name": "端午节"},
+        {"rule": "lunar", "month": 8, "day": 15, "name": "中秋节"},
+        {"rule": "fixed", "month": 10, "day": 1, "days": 3, "name": "国庆节"},
+    ],
+    "customdays": [
+        {"rule": "fixed", "month": 3, "day": 12, "name": "植树节"},
+        {"rule": "weekday", "month": 5, "weekday": 7, "nth": 2, "name": "母亲节"},
+        {"rule": "weekday", "month": 6, "weekday": 7, "nth": 3, "name": "父亲节"},
+    ],
+    "studentdays": [
+        {"rule": "fixed", "month": 7, "day": 10, "days": 53, "name": "暑假"},
+    ],
+}
+
+
+def write_calendar(path: str, data: Dict) -> None:
+    """写入YAML日历文件"""
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, Dumper=dumper, allow_unicode=True, sort_keys=False)
+
+
+def random_dates(count: int, seed: int = 1) -> List[date]:
+    """在日历范围内随机取日期"""
+    rng = random.Random(seed)
+    first = date(FIRST_YEAR, 1, 1)
+    span = (date(FIRST_YEAR + YEARS, 1, 1) - first).days
+    return [first + timedelta(days=rng.randrange(span)) for _ in range(count)]
+
+
+def measure(func: Callable[[int], object], iterations: int) -> Dict[str, float]:
+    """逐次计时，返回延迟分位数（微秒）"""
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter_ns()
+        func(i)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+    samples.sort()
+
+    def pct(p: float) -> float:
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))], 2)
+
+    return {
+        "p50_us": pct(0.50),
+        "p95_us": pct(0.95),
+        "p99_us": pct(0.99),
+        "max_us": round(samples[-1], 2),
+        "iterations": iterations,
+    }
+
+
+def allocations(func: Callable[[int], object], iterations: int) -> Dict[str, float]:
+    """用 tracemalloc 统计每次调用的峰值内存、结果保留的内存和分配块数"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start_size, _ = tracemalloc.get_traced_memory()
+        results = []
+        for i in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            results.append(func(i))
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+        end_size, _ = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+        del results
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib": round(max(peaks) / 1024, 1),
+        "retained_kib_per_call": round((end_size - start_size) / iterations / 1024, 2),
+        "retained_blocks_per_call": round(max(blocks, 0) / iterations, 1),
+    }
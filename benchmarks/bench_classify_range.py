@@ -0,0 +1,80 @@
+"""Benchmark for SmartWorkdayDataManager.classify_range (smart_workday.classify_range).
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/bench_classify_range.py
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+from datetime import date, timedelta
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.smart_workday.coordinator import SmartWorkdayDataManager  # noqa: E402
+
+FIRST_YEAR = 2020
+YEARS = 10
+
+
+def _synthetic_calendar(first_year: int, years: int) -> dict:
+    """生成多年的节假日/调休/自定义/学生假期"""
+    data = {"holidays": [], "customdays": [], "studentdays": []}
+    for year in range(first_year, first_year + years):
+        data["holidays"] += [
+            {"start": f"{year}-01-01", "end": f"{year}-01-03", "name": "元旦"},
+            {"start": f"{year}-02-10", "end": f"{year}-02-16", "name": "春节"},
+            {"date": f"{year}-02-08", "name": "春节调休"},
+            {"start": f"{year}-05-01", "end": f"{year}-05-05", "name": "劳动节"},
+            {"start": f"{year}-10-01", "end": f"{year}-10-07", "name": "国庆节"},
+            {"date": f"{year}-10-10", "name": "国庆节调休"},
+        ]
+        data["customdays"].append({"date": f"{year}-03-12", "name": "植树节"})
+        data["studentdays"] += [
+            {"start": f"{year}-01-20", "end": f"{year}-02-20", "name": "寒假"},
+            {"start": f"{year}-07-10", "end": f"{year}-08-31", "name": "暑假"},
+        ]
+    return data
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "calendar.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(_synthetic_calendar(FIRST_YEAR, YEARS), f, allow_unicode=True)
+
+        start = date(FIRST_YEAR, 1, 1)
+        end = date(FIRST_YEAR + YEARS, 1, 1) - timedelta(days=1)
+
+        def cold() -> None:
+            manager = SmartWorkdayDataManager(None, path)
+            manager.classify_range(start, end)
+
+        manager = SmartWorkdayDataManager(None, path)
+        manager.classify_range(start, end)
+
+        def warm() -> None:
+            manager.classify_range(start, end)
+
+        def per_day() -> None:
+            day = start
+            while day <= end:
+                manager.analyze_day(day, manager.get_today_events(day))
+                day += timedelta(days=1)
+
+        days = (end - start).days + 1
+        for name, func, number in (
+            ("classify_range (cold, incl. parse)", cold, 5),
+            ("classify_range (warm)", warm, 20),
+            ("per-day get_today_events + analyze_day", per_day, 3),
+        ):
+            best = min(timeit.repeat(func, number=number, repeat=3)) / number
+            print(f"{name:42s} {days} days  {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Benchmark suite for the Smart Workday data manager and calendar entity hot paths.
+
+Generates synthetic calendars of increasing size and reports latency
+percentiles and allocations for every hot path. Results can be stored as a
+baseline and later runs compared against it.
+
+    python benchmarks/bench_hot_paths.py                    # run and print
+    python benchmarks/bench_hot_paths.py --save-baseline    # store benchmarks/baseline.json
+    python benchmarks/bench_hot_paths.py --compare          # fail on regressions
+    python benchmarks/bench_hot_paths.py --sizes 100 1000   # subset of sizes
+
+Home Assistant must be installed; no instance is started.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+from _support import SAMPLE_RULES, FakeHass, allocations, measure, random_dates, synthetic_calendar, write_calendar
+
+from custom_components.smart_workday.calendar import SmartWorkdayCalendar
+from custom_components.smart_workday.coordinator import SmartWorkdayDataManager
+from custom_components.smart_workday.const import DOMAIN, HolidayMode
+from custom_components.smart_workday.index import CalendarIndex, normalize_rules
+from custom_components.smart_workday.store import CalendarSources, CalendarStore
+from homeassistant.util import dt
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+# p50 超过基线的倍数视为回归
+DEFAULT_TOLERANCE = 1.5
+
+
+def _iterations(size: int, cheap: int, expensive: int) -> int:
+    """大日历上减少昂贵操作的迭代次数"""
+    return cheap if size <= 10000 else expensive
+
+
+def _cases(hass: FakeHass, calendar_path: str, size: int) -> List[Tuple[str, Callable[[int], object], int]]:
+    """构建本尺寸下的所有基准用例"""
+    loop = asyncio.new_event_loop()
+    manager = SmartWorkdayDataManager(hass, calendar_path)
+    manager.get_index()
+    dates = random_dates(1000)
+    tz = dt.DEFAULT_TIME_ZONE
+    windows = [
+        (datetime.combine(day, datetime.min.time(), tz), datetime.combine(day, datetime.min.time(), tz) + timedelta(days=31))
+        for day in dates
+    ]
+    calendar = SmartWorkdayCalendar(SimpleNamespace(data_manager=manager, entry_id="bench"), None)
+    calendar.hass = hass
+    loop.run_until_complete(calendar.async_get_events(hass, *windows[0]))
+
+    def load_cold(i: int):
+        for store in manager.sources.stores:
+            if os.path.exists(store.sidecar_path):
+                os.remove(store.sidecar_path)
+        return CalendarStore(calendar_path).load_calendar_data()
+
+    def load_sidecar(i: int):
+        return CalendarStore(calendar_path).get_index()
+
+    def get_today_events(i: int):
+        return manager.get_today_events(dates[i % len(dates)])
+
+    def analyze_day(i: int):
+        day = dates[i % len(dates)]
+        return manager.analyze_day(day, manager.get_today_events(day))
+
+    def get_day_info(i: int):
+        # 反复查询同一批日期（日历视图翻页、未来几天），首轮之后均命中缓存
+        return manager.get_day_info(dates[i % 200])
+
+    def get_upcoming_days(i: int):
+        return manager.get_upcoming_days(dates[i % len(dates)])
+
+    def get_upcoming_year(i: int):
+        return manager.get_upcoming_days(dates[i % len(dates)], 365)
+
+    def classify_year(i: int):
+        day = dates[i % len(dates)]
+        return manager.classify_range(day, day + timedelta(days=364))
+
+    rules = normalize_rules(SAMPLE_RULES)
+    rows = manager.get_index().rows
+
+    def rules_fifty_years(i: int):
+        # 每次使用新索引，包含规则按年展开的全部开销
+        index = CalendarIndex(rows, rules)
+        day = dates[i % len(dates)]
+        return index.workdays_between(day, day + timedelta(days=365 * 50), HolidayMode.STANDARD)
+
+    # 大日历 + 一个小文件：每次修改小文件后重新获取索引并查询一年
+    small_path = os.path.join(os.path.dirname(calendar_path), "company.yaml")
+    write_calendar(small_path, synthetic_calendar(10, seed=1))
+    sources = CalendarSources(hass, [calendar_path, small_path],
+                              [CalendarStore(calendar_path), CalendarStore(small_path)])
+    sources.get_index().year_flags(dates[0].year)
+
+    def reload_small_file(i: int):
+        write_calendar(small_path, synthetic_calendar(10, seed=i + 2))
+        os.utime(small_path, ns=(i + 1, i + 1))
+        return sources.get_index().year_flags(dates[0].year)
+
+    def async_get_events(i: int):
+        return loop.run_until_complete(calendar.async_get_events(hass, *windows[i % len(windows)]))
+
+    slow = _iterations(size, 20, 3)
+    return [
+        ("load_calendar_data (yaml parse)", load_cold, slow),
+        ("load_calendar_data (sidecar + index)", load_sidecar, slow),
+        ("load_calendar_data (unchanged)", lambda i: manager.load_calendar_data(), 1000),
+        ("get_today_events", get_today_events, 1000),
+        ("analyze_day", analyze_day, 1000),
+        ("get_day_info (200 dates, repeated)", get_day_info, 1000),
+        ("get_upcoming_days", get_upcoming_days, 500),
+        ("get_upcoming_days (365 days)", get_upcoming_year, 500),
+        ("classify_range (365 days)", classify_year, _iterations(size, 100, 20)),
+        ("SmartWorkdayCalendar.async_get_events (31 days)", async_get_events, 500),
+        ("workdays_between with rules (50 years, cold)", rules_fifty_years, _iterations(size, 20, 3)),
+        ("get_index after editing a small second file", reload_small_file, _iterations(size, 50, 10)),
+    ]
+
+
+def run(sizes: List[int]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """运行所有尺寸的基准"""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = FakeHass(config_dir)
+            calendar_path = hass.config.path("custom_components", DOMAIN, "calendar.yaml")
+            os.makedirs(os.path.dirname(calendar_path))
+            write_calendar(calendar_path, synthetic_calendar(size))
+
+            for name, func, iterations in _cases(hass, calendar_path, size):
+                stats = measure(func, iterations)
+                stats.update(allocations(func, min(iterations, 50)))
+                results.setdefault(name, {})[str(size)] = stats
+                print(
+                    f"{name:48s} {size:>7d}  p50 {stats['p50_us']:>11.1f}us  "
+                    f"p95 {stats['p95_us']:>11.1f}us  p99 {stats['p99_us']:>11.1f}us  "
+                    f"peak {stats['peak_kib']:>9.1f}KiB  retained/call {stats['retained_kib_per_call']:>8.2f}KiB",
+                    flush=True,
+                )
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """与基线比较 p50，返回回归列表"""
+    regressions = []
+    for name, by_size in results.items():
+        for size, stats in by_size.items():
+            base = baseline.get(name, {}).get(size)
+            if base and stats["p50_us"] > base["p50_us"] * tolerance:
+                regressions.append(
+                    f"{name} @ {size}: p50 {stats['p50_us']:.1f}us > {tolerance}x baseline {base['p50_us']:.1f}us"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--save-baseline", action="store_true", help="write results to baseline.json")
+    parser.add_argument("--compare", action="store_true", help="compare p50 against baseline.json")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run(args.sizes)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"baseline written to {BASELINE_PATH}")
+
+    if args.compare:
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Memory benchmark for the Smart Workday event model.
+
+Compares the retained memory of the slotted ``EventRecord`` model (interned
+names, integer kind codes, records shared between the single-day and segment
+tables) with the previous representation, in which every row became a
+``{"name", "type"}`` dict and the tables held ``(seq, event)`` pairs — one new
+pair per event per segment — while the store also kept the parsed YAML.
+
+    python benchmarks/bench_memory.py                  # 10k and 100k entries
+    python benchmarks/bench_memory.py --sizes 1000     # subset of sizes
+    python benchmarks/bench_memory.py --json           # machine readable output
+
+Home Assistant must be installed; no instance is started.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, field, fields
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import yaml
+
+from _support import SAMPLE_RULES, FakeHass, synthetic_calendar, write_calendar
+
+from custom_components.smart_workday.coordinator import DayInfo, SmartWorkdayDataManager
+from custom_components.smart_workday.const import HolidayMode, WorkdayState
+from custom_components.smart_workday.index import CalendarIndex, event_type, intern_row, normalize_calendar
+from custom_components.smart_workday.store import CalendarStore
+
+DEFAULT_SIZES = [10000, 100000]
+DAY_INFOS = 1000
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def retained(build: Callable[[], object]) -> float:
+    """构建对象并返回其保留的内存（MiB），构建期间的临时分配不计入"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return round(size / 1048576, 2)
+
+
+def legacy_tables(rows: List[Tuple[int, int, str, str]]) -> Tuple[Dict, List, List]:
+    """按旧的字典表示构建单天表和区段表：每行一个 {"name", "type"} 字典，表中保存 (顺序, 事件) 对"""
+    single: Dict[int, List[Tuple[int, Dict]]] = {}
+    opening: Dict[int, List[Tuple[int, Dict]]] = {}
+    closing: Dict[int, List[int]] = {}
+    for seq, (start, end, section, name) in enumerate(rows):
+        event = {"name": name, "type": event_type(section, name)}
+        if start == end:
+            single.setdefault(start, []).append((seq, event))
+        else:
+            opening.setdefault(start, []).append((seq, event))
+            closing.setdefault(end + 1, []).append(seq)
+    bounds: List[int] = []
+    segments: List[Tuple[Tuple[int, Dict], ...]] = []
+    active: Dict[int, Dict] = {}
+    for bound in sorted(opening.keys() | closing.keys()):
+        for seq in closing.get(bound, ()):
+            active.pop(seq, None)
+        for seq, event in opening.get(bound, ()):
+            active[seq] = event
+        bounds.append(bound)
+        segments.append(tuple(sorted(active.items())))
+    return {day: tuple(entries) for day, entries in single.items()}, bounds, segments
+
+
+@dataclass
+class LegacyDayInfo:
+    """旧的 DayInfo：普通数据类，事件为字典列表"""
+    date: str
+    weekday: int
+    weekday_name: str
+    state: WorkdayState
+    state_name: str
+    is_workday: bool
+    is_holiday: bool
+    is_weekend: bool
+    is_special_workday: bool
+    is_student_holiday: bool
+    mode: HolidayMode
+    mode_name: str
+    events: List[Dict] = field(default_factory=list)
+    event_names: List[str] = field(default_factory=list)
+    primary_event: str = ""
+    upcoming_days: List[Dict] = field(default_factory=list)
+
+
+def _legacy_day_info(info: DayInfo, shared: Dict[int, Dict]) -> LegacyDayInfo:
+    """把 DayInfo 转换为旧表示（事件为旧索引中共享的字典，不复制）"""
+    values = {f.name: getattr(info, f.name) for f in fields(DayInfo)}
+    values["events"] = [shared[id(e)] for e in info.events]
+    values["event_names"] = list(info.event_names)
+    return LegacyDayInfo(**values)
+
+
+def run_size(workdir: str, size: int) -> Dict[str, float]:
+    """测量单个尺寸下各项保留内存"""
+    data = synthetic_calendar(size)
+    for section, items in SAMPLE_RULES.items():
+        data[section].extend(items)
+    path = os.path.join(workdir, f"calendar_{size}.yaml")
+    write_calendar(path, data)
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    rows = normalize_calendar(data)
+    # 旁路缓存 / 快照中的行：JSON 解码出的每个名称都是独立的字符串对象
+    encoded = json.dumps(rows, ensure_ascii=False)
+    results = {
+        "parsed YAML kept by the store (legacy)": retained(lambda: yaml.load(raw, Loader=_YAML_LOADER)),
+        "rows from JSON (legacy, names not interned)": retained(lambda: [tuple(row) for row in json.loads(encoded)]),
+        "rows from JSON (interned)": retained(lambda: [intern_row(row) for row in json.loads(encoded)]),
+        "event tables (legacy dicts + pairs)": retained(lambda: legacy_tables(rows)),
+        "event tables (EventRecord)": retained(lambda: CalendarIndex(rows)),
+    }
+
+    def store_after_parse() -> CalendarStore:
+        store = CalendarStore(path)
+        store.get_index()
+        return store
+
+    # 第一次解析YAML并写入旁路缓存，第二次从旁路缓存加载
+    results["CalendarStore after YAML parse"] = retained(store_after_parse)
+    results["CalendarStore from sidecar"] = retained(store_after_parse)
+
+    manager = SmartWorkdayDataManager(FakeHass(workdir), path)
+    days = [date(2000, 1, 1) + timedelta(days=i) for i in range(DAY_INFOS)]
+    infos = [manager.analyze_day(day, manager.get_today_events(day)) for day in days]
+    shared = {id(e): e.as_dict() for info in infos for e in info.events}
+    results[f"DayInfo x{DAY_INFOS} (legacy)"] = retained(lambda: [_legacy_day_info(info, shared) for info in infos])
+    results[f"DayInfo x{DAY_INFOS} (slots)"] = retained(
+        lambda: [DayInfo(**{f.name: getattr(info, f.name) for f in fields(DayInfo)}) for info in infos]
+    )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            results[str(size)] = run_size(workdir, size)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+    for size, by_name in results.items():
+        print(f"\n{size} entries (retained MiB)")
+        for name, mib in by_name.items():
+            print(f"  {name:<48} {mib:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,48 @@
 """Smart Workday integration."""
 
 import logging
+import secrets
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, HolidayMode
+from .const import (
+    DOMAIN,
+    DEFAULT_NAME,
+    HolidayMode,
+    CONF_CALENDAR_SOURCES,
+    CONF_ICS_TOKEN,
+    CONF_REMOTE_URL,
+    CONF_UPCOMING_DAYS,
+    DEFAULT_UPCOMING_DAYS,
+)
 from .coordinator import SmartWorkdayDataManager, SmartWorkdayCoordinator
+from .ics import IcsFeed, SmartWorkdayIcsView
+from .remote import RemoteSource, remote_paths, remove_remote_cache
+from .services import async_setup_services
+from .snapshot import CoordinatorSnapshot
+from .store import CalendarSources
+from .templates import async_setup_templates
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.BINARY_SENSOR, Platform.CALENDAR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """设置集成（注册服务、模板函数、websocket 命令和 ICS 订阅）"""
+    async_setup_services(hass)
+    async_setup_templates(hass)
+    async_setup_websocket_api(hass)
+    hass.http.register_view(SmartWorkdayIcsView(hass))
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """设置配置条目"""
@@ -22,18 +53,50 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         new_data = dict(entry.data)
         new_data["holiday_mode"] = HolidayMode.STANDARD.value
         hass.config_entries.async_update_entry(entry, data=new_data)
+
+    # 确保 ICS 订阅令牌存在
+    if CONF_ICS_TOKEN not in entry.data:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_ICS_TOKEN: secrets.token_urlsafe(24)}
+        )
     
-    # 初始化数据管理器
+    # 初始化数据管理器（每个日历文件的解析结果在条目间共享）
     calendar_file = entry.data.get("calendar_file", "calendar.yaml")
     calendar_path = hass.config.path("custom_components", DOMAIN, calendar_file)
-    data_manager = SmartWorkdayDataManager(hass, calendar_path)
+    paths = [calendar_path] + [
+        hass.config.path("custom_components", DOMAIN, source)
+        for source in entry.data.get(CONF_CALENDAR_SOURCES, [])
+    ]
+    # 远程来源同步到本地日历文件，作为最后一个附加来源
+    remote_url = entry.data.get(CONF_REMOTE_URL)
+    if remote_url:
+        paths.append(remote_paths(hass, entry.entry_id)[0])
+    sources = CalendarSources(hass, paths)
+    await sources.async_setup()
+    entry.async_on_unload(sources.async_release)
+    data_manager = SmartWorkdayDataManager(hass, calendar_path, sources)
     
     # 设置假期模式
     data_manager.update_holiday_mode(HolidayMode(entry.data.get("holiday_mode", HolidayMode.STANDARD.value)))
     
     # 初始化协调器
-    coordinator = SmartWorkdayCoordinator(hass, entry.entry_id, data_manager)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = SmartWorkdayCoordinator(
+        hass, entry.entry_id, data_manager, entry.data.get(CONF_UPCOMING_DAYS, DEFAULT_UPCOMING_DAYS),
+        CoordinatorSnapshot(hass, entry.entry_id),
+    )
+    if await coordinator.async_restore_snapshot():
+        # 快照有效：实体直接使用快照数据，完整刷新在后台进行
+        entry.async_create_background_task(
+            hass, coordinator.async_background_refresh(), f"{DOMAIN}_refresh_{entry.entry_id}"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.async_start_listeners())
+
+    remote = None
+    if remote_url:
+        remote = RemoteSource(hass, entry.entry_id, remote_url, coordinator.async_request_refresh)
+        entry.async_on_unload(await remote.async_start())
     
     # 存储数据
     hass.data.setdefault(DOMAIN, {})
@@ -41,6 +104,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "config": entry.data,
         "coordinator": coordinator,
         "data_manager": data_manager,
+        "ics": IcsFeed(data_manager, entry.data.get("name", DEFAULT_NAME)),
+        "remote": remote,
     }
     
     # 设置平台
@@ -57,4 +122,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
         return True
     
-    return False
\ No newline at end of file
+    return False
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """删除配置条目时清理启动快照和远程来源缓存"""
+    await CoordinatorSnapshot(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(remove_remote_cache, hass, entry.entry_id)
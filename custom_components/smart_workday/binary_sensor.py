@@ -1,10 +1,10 @@
 """Binary Sensor platform for Smart Workday."""
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
@@ -18,11 +18,46 @@ from .const import (
     ATTR_IS_WEEKEND,
     ATTR_IS_SPECIAL_WORKDAY,
     ATTR_IS_STUDENT_HOLIDAY,
+    ATTR_EVENTS,
+    ATTR_UPCOMING,
+    ATTR_EVENT_SUMMARY,
+    ATTR_NEXT_EVENT,
+    ATTR_NEXT_EVENT_DATE,
+    CONF_COMPACT_ATTRIBUTES,
 )
 from .coordinator import SmartWorkdayCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# 精简模式保留的标量属性
+_COMPACT_KEYS: Tuple[str, ...] = (
+    "state",
+    "state_name",
+    "date",
+    "weekday",
+    "weekday_name",
+    ATTR_IS_WORKDAY,
+    ATTR_IS_HOLIDAY,
+    ATTR_IS_WEEKEND,
+    ATTR_IS_SPECIAL_WORKDAY,
+    ATTR_IS_STUDENT_HOLIDAY,
+    "mode",
+    "mode_name",
+    "primary_event",
+)
+
+
+def compact_attributes(data: Dict[str, Any]) -> Dict[str, Any]:
+    """生成精简属性：标量标志 + 事件摘要，完整列表通过 get_day_details 服务获取"""
+    attributes = {key: data[key] for key in _COMPACT_KEYS if key in data}
+    attributes[ATTR_EVENT_SUMMARY] = "、".join(data.get("event_names") or [])
+    # 未来事件包含正在进行（今天之前开始）的多日事件，下一个事件取今天之后开始的第一个
+    today = data.get("date") or ""
+    upcoming = next((row for row in data.get(ATTR_UPCOMING) or [] if row["start"] > today), None)
+    attributes[ATTR_NEXT_EVENT] = upcoming["name"] if upcoming else ""
+    attributes[ATTR_NEXT_EVENT_DATE] = upcoming["start"] if upcoming else None
+    return attributes
+
 
 class SmartWorkdayBaseEntity(CoordinatorEntity, BinarySensorEntity):
     """传感器基础类"""
@@ -37,6 +72,28 @@ class SmartWorkdayBaseEntity(CoordinatorEntity, BinarySensorEntity):
         self._attr_should_poll = False
         if device_class:
             self._attr_device_class = device_class
+        # 上次写入的状态指纹
+        self._last_fingerprint: Optional[tuple] = None
+
+    def _state_fingerprint(self) -> tuple:
+        """状态指纹：可用性、开关状态和属性（属性按结构比较）"""
+        return (self.available, self.is_on, self.extra_state_attributes)
+
+    async def async_added_to_hass(self) -> None:
+        """添加到HA时记录初始状态指纹"""
+        await super().async_added_to_hass()
+        self._last_fingerprint = self._state_fingerprint()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """只在状态或属性变化时写入状态"""
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._last_fingerprint:
+            self.coordinator.update_stats["state_writes_suppressed"] += 1
+            return
+        self._last_fingerprint = fingerprint
+        self.coordinator.update_stats["state_writes"] += 1
+        self.async_write_ha_state()
 
     @property
     def is_on(self) -> bool:
@@ -51,9 +108,13 @@ class SmartWorkdayBaseEntity(CoordinatorEntity, BinarySensorEntity):
 
 class SmartWorkdaySensor(SmartWorkdayBaseEntity):
     """主传感器 - 返回是否是工作日"""
-    
-    def __init__(self, coordinator: SmartWorkdayCoordinator, device_info: DeviceInfo):
+
+    # 事件列表不写入记录器数据库
+    _unrecorded_attributes = frozenset({ATTR_EVENTS, ATTR_UPCOMING})
+
+    def __init__(self, coordinator: SmartWorkdayCoordinator, device_info: DeviceInfo, compact: bool = False):
         super().__init__(coordinator, device_info, "main", "智能工作日", "mdi:calendar", "workday")
+        self._compact = compact
 
     @property
     def is_on(self) -> bool:
@@ -62,8 +123,9 @@ class SmartWorkdaySensor(SmartWorkdayBaseEntity):
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
-        """返回所有属性"""
-        return self.coordinator.data or {}
+        """返回属性（精简模式下只返回标量属性）"""
+        data = self.coordinator.data or {}
+        return compact_attributes(data) if self._compact and data else data
 
 
 class SmartWorkdayBinarySensor(SmartWorkdayBaseEntity):
@@ -105,7 +167,9 @@ async def async_setup_entry(
         sw_version="1.0.0",
     )
     
-    entities = [SmartWorkdaySensor(coordinator, device_info)]
+    # 旧配置条目未设置时保持完整属性
+    compact = entry.data.get(CONF_COMPACT_ATTRIBUTES, False)
+    entities = [SmartWorkdaySensor(coordinator, device_info, compact)]
     
     # 添加学生假期传感器
     for sensor_type, config in BINARY_SENSOR_TYPES.items():
@@ -1,23 +1,136 @@
 """Calendar platform for Smart Workday."""
 
+import asyncio
 import logging
 import hashlib
-from datetime import datetime, timedelta
-from typing import List, Optional
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from heapq import merge
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary, ref
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt
 
-from .const import DOMAIN
-from .coordinator import SmartWorkdayCoordinator
+from .const import DOMAIN, SIGNAL_CALENDAR_UPDATED
+from .coordinator import SmartWorkdayCoordinator, SmartWorkdayDataManager
+from .index import CalendarIndex
 
 _LOGGER = logging.getLogger(__name__)
 
+_EVENT_START = attrgetter("start")
+
+
+class CalendarEventStore:
+    """日历事件存储 - 按开始时间排序，二分查找时间段
+
+    周期规则事件按公历年在首次查询时生成并缓存。
+    """
+
+    def __init__(self, events: List[CalendarEvent],
+                 expand: Optional[Callable[[int], List[CalendarEvent]]] = None):
+        self.events = sorted(events, key=_EVENT_START)
+        self._starts = [e.start for e in self.events]
+        # 最长事件跨度，用于确定需要检查的起点下界
+        self._max_span = max((e.end - e.start for e in self.events), default=timedelta(0))
+        self._expand = expand
+        self._years: Dict[int, List[CalendarEvent]] = {}
+
+    def year_events(self, year: int) -> List[CalendarEvent]:
+        """获取某公历年开始的规则事件"""
+        if self._expand is None:
+            return []
+        events = self._years.get(year)
+        if events is None:
+            events = self._years[year] = sorted(self._expand(year), key=_EVENT_START)
+        return events
+
+    def ending_after(self, moment: datetime) -> List[CalendarEvent]:
+        """获取在某时刻之后结束的固定日期事件（按开始时间排序）"""
+        lo = bisect_left(self._starts, moment - self._max_span)
+        return [e for e in self.events[lo:] if e.end > moment]
+
+    def between(self, start: datetime, end: datetime) -> List[CalendarEvent]:
+        """获取与时间段重叠的事件"""
+        lo = bisect_left(self._starts, start - self._max_span)
+        hi = bisect_right(self._starts, end)
+        events = [e for e in self.events[lo:hi] if e.end >= start]
+        if self._expand is not None:
+            # 上一年开始的规则事件可能跨年
+            for year in range(start.year - 1, end.year + 1):
+                events.extend(e for e in self.year_events(year) if e.end >= start and e.start <= end)
+        return events
+
+
+def _generate_event_id(start, name, source) -> str:
+    """生成唯一事件ID"""
+    return hashlib.md5(f"{start}_{name}_{source}".encode()).hexdigest()
+
+
+def _create_event(start_date, end_date, name, source) -> CalendarEvent:
+    """创建日历事件"""
+    # 解析开始日期
+    if isinstance(start_date, str):
+        start = dt.parse_date(start_date)
+        if not start:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    else:
+        start = start_date
+        
+    # 解析结束日期
+    if isinstance(end_date, str):
+        end = dt.parse_date(end_date)
+        if not end:
+            end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    else:
+        end = end_date
+    
+    # 转换为datetime
+    event_start = datetime.combine(start, datetime.min.time())
+    event_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    
+    # 添加时区
+    if event_start.tzinfo is None:
+        event_start = event_start.replace(tzinfo=dt.DEFAULT_TIME_ZONE)
+    if event_end.tzinfo is None:
+        event_end = event_end.replace(tzinfo=dt.DEFAULT_TIME_ZONE)
+    
+    return CalendarEvent(
+        start=event_start,
+        end=event_end,
+        summary=name,
+        description="调休上班日" if "调休" in name else f"来源: {source}",
+        uid=_generate_event_id(start_date, name, source),
+    )
+
+
+def _rule_expander(index: CalendarIndex) -> Callable[[int], List[CalendarEvent]]:
+    """规则事件的按年展开函数（弱引用索引，避免事件存储使缓存键无法回收，也不持有实体）"""
+    index_ref = ref(index)
+
+    def expand(year: int) -> List[CalendarEvent]:
+        index = index_ref()
+        if index is None:
+            # 文件变化后索引已重建并释放，旧存储随之失效，本次查询不再展开
+            return []
+        return [
+            _create_event(date.fromordinal(start), date.fromordinal(end), name, source)
+            for start, end, source, name in index.rule_starts(year)
+        ]
+
+    return expand
+
+
+# 每个日历索引对应一个事件存储，共享同一日历文件的实体共用（索引释放后自动回收）
+_EVENT_STORES: "WeakKeyDictionary[CalendarIndex, CalendarEventStore]" = WeakKeyDictionary()
+
 
 class SmartWorkdayCalendar(CoordinatorEntity, CalendarEntity):
     """日历实体 - 显示所有假期"""
@@ -28,67 +141,31 @@ class SmartWorkdayCalendar(CoordinatorEntity, CalendarEntity):
         self._attr_name = "智能工作日日历"
         self._attr_icon = "mdi:calendar-month"
         self._attr_device_info = device_info
-        self._event_list: List[CalendarEvent] = []
-
-    def _generate_event_id(self, start, name, source) -> str:
-        """生成唯一事件ID"""
-        return hashlib.md5(f"{start}_{name}_{source}".encode()).hexdigest()
-
-    def _create_event(self, start_date, end_date, name, source) -> CalendarEvent:
-        """创建日历事件"""
-        # 解析开始日期
-        if isinstance(start_date, str):
-            start = dt.parse_date(start_date)
-            if not start:
-                start = datetime.strptime(start_date, "%Y-%m-%d").date()
-        else:
-            start = start_date
-            
-        # 解析结束日期
-        if isinstance(end_date, str):
-            end = dt.parse_date(end_date)
-            if not end:
-                end = datetime.strptime(end_date, "%Y-%m-%d").date()
-        else:
-            end = end_date
-        
-        # 转换为datetime
-        event_start = datetime.combine(start, datetime.min.time())
-        event_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
-        
-        # 添加时区
-        if event_start.tzinfo is None:
-            event_start = event_start.replace(tzinfo=dt.DEFAULT_TIME_ZONE)
-        if event_end.tzinfo is None:
-            event_end = event_end.replace(tzinfo=dt.DEFAULT_TIME_ZONE)
-        
-        return CalendarEvent(
-            start=event_start,
-            end=event_end,
-            summary=name,
-            description="调休上班日" if "调休" in name else f"来源: {source}",
-            uid=self._generate_event_id(start_date, name, source),
-        )
+        # 按开始时间排序的当前及未来事件，游标指向第一个尚未结束的事件
+        self._timeline: List[CalendarEvent] = []
+        self._cursor = 0
+        # 生成时间线时的 (数据版本, 年份)，变化时重建
+        self._timeline_key: Optional[Tuple[int, int]] = None
+        self._timeline_task: Optional[asyncio.Task] = None
 
-    def _generate_events(self) -> List[CalendarEvent]:
-        """生成所有事件"""
-        events = []
-        data = self.coordinator.data_manager.get_calendar_events()
-        
-        # 处理所有来源
-        for source in ["holidays", "customdays", "schooldays"]:
-            for item in data.get(source, []):
-                if "date" in item:
-                    events.append(self._create_event(
-                        item["date"], item["date"], item["name"], source
-                    ))
-                elif "start" in item and "end" in item:
-                    events.append(self._create_event(
-                        item["start"], item["end"], item["name"], source
-                    ))
-        
-        _LOGGER.debug("生成了 %d 个日历事件", len(events))
-        return events
+    def _get_stores(self) -> List[CalendarEventStore]:
+        """获取每个日历文件的事件存储，只重建数据变化的文件"""
+        data_manager = self.coordinator.data_manager
+        return [self._get_store(part) for part in data_manager.get_index().parts]
+
+    def _get_store(self, index: CalendarIndex) -> CalendarEventStore:
+        """获取单个文件索引的事件存储"""
+        store = _EVENT_STORES.get(index)
+        if store is None:
+            with self.coordinator.data_manager.sources.perf.time("calendar_events"):
+                events = [
+                    _create_event(date.fromordinal(start), date.fromordinal(end), name, source)
+                    for start, end, source, name in index.rows
+                ]
+                expand = _rule_expander(index) if index.rules else None
+                store = _EVENT_STORES[index] = CalendarEventStore(events, expand)
+            _LOGGER.debug("生成了 %d 个日历事件", len(events))
+        return store
 
     async def async_get_events(self, hass, start_date, end_date) -> List[CalendarEvent]:
         """获取时间段内的事件"""
@@ -98,32 +175,92 @@ class SmartWorkdayCalendar(CoordinatorEntity, CalendarEntity):
         if end_date.tzinfo is None:
             end_date = end_date.replace(tzinfo=dt.DEFAULT_TIME_ZONE)
         
-        # 在executor中生成事件
-        all_events = await hass.async_add_executor_job(self._generate_events)
-        
-        # 过滤时间范围
-        return [
-            e for e in all_events 
-            if e.start <= end_date and e.end >= start_date
-        ]
+        # 在executor中检查文件状态并按需展开规则事件
+        return await hass.async_add_executor_job(
+            lambda: [e for store in self._get_stores() for e in store.between(start_date, end_date)]
+        )
 
-    @property
-    def event(self) -> Optional[CalendarEvent]:
-        """返回下一个即将发生的事件"""
-        if not self._event_list:
-            return None
-        
-        now = dt.now()
-        future = [e for e in self._event_list if e.start > now]
-        return min(future, key=lambda e: e.start) if future else None
+    def _timeline_version(self) -> Tuple[int, int]:
+        """时间线版本：日历数据版本 + 当前年份（规则事件只展开今明两年）"""
+        return (self.coordinator.data_manager.data_version, dt.now().year)
 
-    async def async_update(self) -> None:
-        """更新日历事件"""
+    def _build_timeline(self, now: datetime) -> List[CalendarEvent]:
+        """合并各文件尚未结束的固定日期事件和今明两年的规则事件（含上一年开始的跨年事件）"""
+        year = now.year
+        parts = []
+        for store in self._get_stores():
+            parts.append(store.ending_after(now))
+            parts.extend(
+                [e for e in store.year_events(y) if e.end > now] for y in (year - 1, year, year + 1)
+            )
+        return list(merge(*parts, key=_EVENT_START))
+
+    async def _async_rebuild_timeline(self) -> None:
+        """在executor中重建事件时间线并写入状态"""
+        # 先取版本再读数据，期间数据变化时下次更新会再次重建
+        key = self._timeline_version()
         try:
-            self._event_list = await self.hass.async_add_executor_job(self._generate_events)
-            _LOGGER.debug("日历更新完成，共 %d 个事件", len(self._event_list))
+            self._timeline = await self.hass.async_add_executor_job(self._build_timeline, dt.now())
         except Exception as e:
             _LOGGER.error("更新日历失败: %s", e)
+            return
+        self._cursor = 0
+        self._timeline_key = key
+        _LOGGER.debug("日历时间线更新完成，共 %d 个事件", len(self._timeline))
+        self.async_write_ha_state()
+
+    @callback
+    def _schedule_rebuild(self) -> None:
+        """后台重建时间线，取消尚未完成的上一次重建"""
+        if self._timeline_task is not None and not self._timeline_task.done():
+            self._timeline_task.cancel()
+        self._timeline_task = self.hass.async_create_background_task(
+            self._async_rebuild_timeline(), f"{DOMAIN}_calendar_timeline_{self.coordinator.entry_id}"
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """添加到HA时在后台生成时间线，不阻塞平台设置"""
+        await super().async_added_to_hass()
+        # 只影响今天以外日期的修改不会改变协调器数据，也就不会通知监听者，需单独订阅数据变化
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_CALENDAR_UPDATED, self._handle_calendar_updated)
+        )
+        self._schedule_rebuild()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """移除时取消未完成的重建"""
+        if self._timeline_task is not None:
+            self._timeline_task.cancel()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """日历数据或年份变化时重建时间线，否则只刷新状态"""
+        if self._timeline_version() != self._timeline_key:
+            self._schedule_rebuild()
+        else:
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_calendar_updated(self, entry_id: str, data_manager: SmartWorkdayDataManager) -> None:
+        """日历数据或假期模式变化（调度信号回调），数据版本变化时重建时间线"""
+        if entry_id == self.coordinator.entry_id and self._timeline_version() != self._timeline_key:
+            self._schedule_rebuild()
+
+    @property
+    def event(self) -> Optional[CalendarEvent]:
+        """返回当前或下一个事件
+
+        游标只向前移动，跳过已结束的事件；事件开始和结束时基类会按时
+        写入状态，因此不需要轮询。
+        """
+        timeline = self._timeline
+        now = dt.now()
+        cursor = self._cursor
+        while cursor < len(timeline) and timeline[cursor].end <= now:
+            cursor += 1
+        self._cursor = cursor
+        return timeline[cursor] if cursor < len(timeline) else None
 
 
 async def async_setup_entry(
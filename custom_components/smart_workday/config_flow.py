@@ -2,7 +2,8 @@
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.helpers import selector
+from homeassistant.helpers import config_validation as cv, selector
+from homeassistant.helpers.network import NoURLAvailableError, get_url
 import logging
 import yaml
 import os
@@ -14,10 +15,43 @@ from .const import (
     DEFAULT_NAME, 
     HolidayMode,
     DEFAULT_YAML_TEMPLATE,
+    CONF_CALENDAR_SOURCES,
+    CONF_ICS_IMPORT,
+    CONF_ICS_IMPORT_SECTION,
+    CONF_ICS_TOKEN,
+    ICS_URL,
+    CONF_REMOTE_URL,
+    CONF_COMPACT_ATTRIBUTES,
+    DEFAULT_COMPACT_ATTRIBUTES,
+    CONF_UPCOMING_DAYS,
+    DEFAULT_UPCOMING_DAYS,
+    MAX_UPCOMING_DAYS,
 )
 
+from .ics_import import async_import_ics
+from .index import CALENDAR_SECTIONS
+
 _LOGGER = logging.getLogger(__name__)
 
+# 未来事件窗口选择器
+UPCOMING_DAYS_SELECTOR = selector.NumberSelector(
+    selector.NumberSelectorConfig(
+        min=1,
+        max=MAX_UPCOMING_DAYS,
+        step=1,
+        mode=selector.NumberSelectorMode.BOX,
+        unit_of_measurement="天",
+    )
+)
+
+# 附加日历来源选择器（每行一个文件或目录）
+CALENDAR_SOURCES_SELECTOR = selector.TextSelector(selector.TextSelectorConfig(multiple=True))
+
+# ICS 导入分类选择器
+ICS_IMPORT_SECTION_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(options=list(CALENDAR_SECTIONS), mode="dropdown")
+)
+
 
 class SmartWorkdayConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """配置流 - 处理首次添加集成"""
@@ -32,6 +66,8 @@ class SmartWorkdayConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data={
                     "name": user_input.get("name", DEFAULT_NAME),
                     "holiday_mode": user_input.get("holiday_mode", HolidayMode.STANDARD.value),
+                    CONF_UPCOMING_DAYS: int(user_input.get(CONF_UPCOMING_DAYS, DEFAULT_UPCOMING_DAYS)),
+                    CONF_COMPACT_ATTRIBUTES: user_input.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES),
                     "calendar_file": "calendar.yaml",
                 }
             )
@@ -55,6 +91,8 @@ class SmartWorkdayConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         mode="dropdown",
                     )
                 ),
+                vol.Required(CONF_UPCOMING_DAYS, default=DEFAULT_UPCOMING_DAYS): UPCOMING_DAYS_SELECTOR,
+                vol.Required(CONF_COMPACT_ATTRIBUTES, default=DEFAULT_COMPACT_ATTRIBUTES): selector.BooleanSelector(),
             }),
         )
 
@@ -106,6 +144,14 @@ class SmartWorkdayOptionsFlow(config_entries.OptionsFlow):
             _LOGGER.error("读取YAML文件失败: %s", e)
             return DEFAULT_YAML_TEMPLATE
 
+    def _ics_url(self) -> str:
+        """ICS 订阅的完整地址，未配置 HA 访问地址时返回相对路径"""
+        path = ICS_URL.format(token=self._config_entry.data[CONF_ICS_TOKEN])
+        try:
+            return get_url(self.hass) + path
+        except NoURLAvailableError:
+            return path
+
     def _build_sections_text(self) -> str:
         """构建假期类型说明"""
         lines = []
@@ -115,6 +161,13 @@ class SmartWorkdayOptionsFlow(config_entries.OptionsFlow):
         lines.append("  • **studentdays**：学生假期 - 独立传感器")
         lines.append("")
         lines.append(f"📁 **配置文件**：`{self._calendar_path}`")
+        for source in self._config_entry.data.get(CONF_CALENDAR_SOURCES, []):
+            lines.append(f"📁 **附加来源**：`{source}`")
+        if self._config_entry.data.get(CONF_REMOTE_URL):
+            lines.append(f"🌐 **远程来源**：`{self._config_entry.data[CONF_REMOTE_URL]}`")
+        if self._config_entry.data.get(CONF_ICS_TOKEN):
+            # 订阅地址即访问凭据，只在管理员可见的选项页面显示，不写入日志
+            lines.append(f"🔗 **ICS 订阅**：`{self._ics_url()}`（地址即访问凭据，请勿公开）")
         return "\n".join(lines)
 
     async def _handle_user_input(self, user_input: Dict[str, Any]) -> Dict[str, Any]:
@@ -157,6 +210,15 @@ class SmartWorkdayOptionsFlow(config_entries.OptionsFlow):
                 errors["yaml_content"] = "invalid_yaml"
                 return await self._show_form(errors)
             
+            # 验证远程来源地址（只允许 http/https）
+            remote_url = (user_input.get(CONF_REMOTE_URL) or "").strip()
+            if remote_url:
+                try:
+                    cv.url(remote_url)
+                except vol.Invalid:
+                    errors[CONF_REMOTE_URL] = "invalid_url"
+                    return await self._show_form(errors)
+            
             # 保存YAML文件
             try:
                 async with aiofiles.open(self._calendar_path, 'w', encoding='utf-8') as f:
@@ -167,9 +229,31 @@ class SmartWorkdayOptionsFlow(config_entries.OptionsFlow):
                 errors["base"] = "save_failed"
                 return await self._show_form(errors)
             
+            # 导入 ICS 文件，结果加入附加来源
+            sources = [
+                source.strip() for source in user_input.get(CONF_CALENDAR_SOURCES, []) if source.strip()
+            ]
+            ics_path = (user_input.get(CONF_ICS_IMPORT) or "").strip()
+            if ics_path:
+                try:
+                    result = await async_import_ics(
+                        self.hass, self._config_entry, ics_path,
+                        user_input.get(CONF_ICS_IMPORT_SECTION, "holidays"),
+                    )
+                except (OSError, ValueError) as e:
+                    _LOGGER.error("导入ICS文件失败: %s", e)
+                    errors[CONF_ICS_IMPORT] = "import_failed"
+                    return await self._show_form(errors)
+                if result["source"] not in sources:
+                    sources.append(result["source"])
+
             # 更新配置中的模式
             new_data = dict(self._config_entry.data)
             new_data["holiday_mode"] = holiday_mode.value
+            new_data[CONF_UPCOMING_DAYS] = int(user_input.get(CONF_UPCOMING_DAYS, DEFAULT_UPCOMING_DAYS))
+            new_data[CONF_COMPACT_ATTRIBUTES] = user_input.get(CONF_COMPACT_ATTRIBUTES, False)
+            new_data[CONF_CALENDAR_SOURCES] = sources
+            new_data[CONF_REMOTE_URL] = remote_url
             self.hass.config_entries.async_update_entry(self._config_entry, data=new_data)
             
             # 触发重新加载
@@ -189,6 +273,10 @@ class SmartWorkdayOptionsFlow(config_entries.OptionsFlow):
     async def _show_form(self, errors: Dict[str, str]):
         """显示配置表单"""
         current_mode = self._config_entry.data.get("holiday_mode", HolidayMode.STANDARD.value)
+        current_upcoming = self._config_entry.data.get(CONF_UPCOMING_DAYS, DEFAULT_UPCOMING_DAYS)
+        current_sources = self._config_entry.data.get(CONF_CALENDAR_SOURCES, [])
+        current_compact = self._config_entry.data.get(CONF_COMPACT_ATTRIBUTES, False)
+        current_remote = self._config_entry.data.get(CONF_REMOTE_URL, "")
         
         # 模式选项
         mode_options = [
@@ -210,6 +298,14 @@ class SmartWorkdayOptionsFlow(config_entries.OptionsFlow):
                     mode="dropdown",
                 )
             ),
+            vol.Required(CONF_UPCOMING_DAYS, default=current_upcoming): UPCOMING_DAYS_SELECTOR,
+            vol.Required(CONF_COMPACT_ATTRIBUTES, default=current_compact): selector.BooleanSelector(),
+            vol.Optional(CONF_CALENDAR_SOURCES, default=current_sources): CALENDAR_SOURCES_SELECTOR,
+            vol.Optional(CONF_REMOTE_URL, default=current_remote): selector.TextSelector(
+                selector.TextSelectorConfig(type=selector.TextSelectorType.URL)
+            ),
+            vol.Optional(CONF_ICS_IMPORT, default=""): selector.TextSelector(),
+            vol.Optional(CONF_ICS_IMPORT_SECTION, default="holidays"): ICS_IMPORT_SECTION_SELECTOR,
             vol.Required("yaml_content", default=self._yaml_content): selector.TemplateSelector(),
         })
         
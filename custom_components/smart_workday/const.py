@@ -6,6 +6,52 @@ from typing import Final, Dict, List
 DOMAIN: Final = "smart_workday"
 DEFAULT_NAME: Final = "智能工作日"
 
+# 未来事件窗口（天）
+CONF_UPCOMING_DAYS: Final = "upcoming_days"
+DEFAULT_UPCOMING_DAYS: Final = 7
+MAX_UPCOMING_DAYS: Final = 365
+
+# 精简属性模式：状态属性只保留标量，完整事件列表通过服务获取
+CONF_COMPACT_ATTRIBUTES: Final = "compact_attributes"
+DEFAULT_COMPACT_ATTRIBUTES: Final = True
+
+# 附加日历来源（文件或目录，相对路径基于集成目录）
+CONF_CALENDAR_SOURCES: Final = "calendar_sources"
+
+# ICS 订阅地址中的访问令牌（首次加载时生成）
+CONF_ICS_TOKEN: Final = "ics_token"
+ICS_URL: Final = "/api/smart_workday/{token}/calendar.ics"
+# ICS 订阅默认覆盖 [今年-1, 今年+1]，单次请求最多跨越的年数
+ICS_DEFAULT_YEARS_BEFORE: Final = 1
+ICS_DEFAULT_YEARS_AFTER: Final = 1
+ICS_MAX_YEARS: Final = 200
+
+# ICS 导入：默认输出目录（相对集成目录）、进度事件和进度上报间隔（事件数）
+CONF_ICS_IMPORT: Final = "ics_import"
+CONF_ICS_IMPORT_SECTION: Final = "ics_import_section"
+ICS_IMPORT_DIR: Final = "imported"
+EVENT_IMPORT_PROGRESS: Final = f"{DOMAIN}_import_progress"
+ICS_IMPORT_PROGRESS_EVERY: Final = 5000
+
+# 远程节假日来源（JSON 或 ICS 地址）：同步结果缓存在集成目录的 remote 子目录，并作为附加来源
+CONF_REMOTE_URL: Final = "remote_url"
+REMOTE_DIR: Final = "remote"
+# 同步间隔、失败后重试的初始/最大间隔、请求超时（秒）和响应大小上限（字节）
+REMOTE_SYNC_INTERVAL: Final = 12 * 3600
+REMOTE_RETRY_MIN: Final = 60
+REMOTE_RETRY_MAX: Final = 6 * 3600
+REMOTE_TIMEOUT: Final = 30
+REMOTE_MAX_BYTES: Final = 16 * 1024 * 1024
+
+# 共享日历存储注册表（hass.data 键）
+DATA_CALENDARS: Final = f"{DOMAIN}_calendars"
+
+# 月历网格订阅（hass.data 键）
+DATA_DAY_GRID: Final = f"{DOMAIN}_day_grid"
+
+# 日历数据或假期模式变化的调度信号，参数为 (条目ID, 数据管理器)
+SIGNAL_CALENDAR_UPDATED: Final = f"{DOMAIN}_calendar_updated"
+
 
 class HolidayMode(str, Enum):
     """假期模式"""
@@ -77,6 +123,11 @@ ATTR_IS_HOLIDAY: Final = "is_holiday"
 ATTR_IS_WEEKEND: Final = "is_weekend"
 ATTR_IS_SPECIAL_WORKDAY: Final = "is_special_workday"
 ATTR_IS_STUDENT_HOLIDAY: Final = "is_student_holiday"
+ATTR_EVENTS: Final = "events"
+ATTR_UPCOMING: Final = "upcoming"
+ATTR_EVENT_SUMMARY: Final = "event_summary"
+ATTR_NEXT_EVENT: Final = "next_event"
+ATTR_NEXT_EVENT_DATE: Final = "next_event_date"
 
 
 # 二进制传感器配置 - 只保留学生假期传感器
@@ -88,6 +139,40 @@ BINARY_SENSOR_TYPES: Dict[str, Dict[str, str]] = {
     },
 }
 
+# 服务
+SERVICE_CLASSIFY_RANGE: Final = "classify_range"
+SERVICE_ADD_WORKDAYS: Final = "add_workdays"
+SERVICE_WORKDAYS_BETWEEN: Final = "workdays_between"
+SERVICE_NEXT_WORKDAY: Final = "next_workday"
+SERVICE_PREVIOUS_WORKDAY: Final = "previous_workday"
+SERVICE_GET_DAY_DETAILS: Final = "get_day_details"
+SERVICE_IMPORT_ICS: Final = "import_ics"
+SERVICE_SYNC_REMOTE: Final = "sync_remote"
+
+# 服务参数
+ATTR_DATE: Final = "date"
+ATTR_DAYS: Final = "days"
+ATTR_START_DATE: Final = "start_date"
+ATTR_END_DATE: Final = "end_date"
+ATTR_MODE: Final = "mode"
+ATTR_ENTRY_ID: Final = "entry_id"
+ATTR_PATH: Final = "path"
+ATTR_SECTION: Final = "section"
+ATTR_OUTPUT: Final = "output"
+
+# 批量查询最大天数（约100年）
+MAX_RANGE_DAYS: Final = 36525
+
+# 每个数据管理器缓存的单日分析结果（DayInfo）数量
+DAY_CACHE_SIZE: Final = 1024
+
+# 每次刷新为模板函数预先生成的年份：[今年-1, 今年+2]，范围外的日期返回 None
+TEMPLATE_YEARS_BEFORE: Final = 1
+TEMPLATE_YEARS_AFTER: Final = 2
+
+# 月历网格单次最多天数（一年）
+GRID_MAX_DAYS: Final = 366
+
 # 星期名称
 WEEKDAY_NAMES: Final[List[str]] = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
 
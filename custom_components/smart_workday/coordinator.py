@@ -1,11 +1,15 @@
 """Coordinator for Smart Workday - 共享数据管理"""
 
 import logging
-from datetime import datetime, timedelta, date
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+import threading
+from collections import OrderedDict
+from datetime import timedelta, date
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
+from dataclasses import dataclass
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_change, async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt
 
@@ -19,15 +23,61 @@ from .const import (
     ATTR_IS_SPECIAL_WORKDAY,
     ATTR_IS_STUDENT_HOLIDAY,
     WEEKDAY_NAMES,
+    DEFAULT_UPCOMING_DAYS,
+    DAY_CACHE_SIZE,
+    SIGNAL_CALENDAR_UPDATED,
+    TEMPLATE_YEARS_BEFORE,
+    TEMPLATE_YEARS_AFTER,
 )
+from .index import (
+    BuiltYearsView,
+    CalendarIndex,
+    CompositeIndex,
+    EventRecord,
+    KIND_CUSTOM,
+    KIND_HOLIDAY,
+    KIND_SPECIAL,
+    KIND_STUDENT,
+    STATE_CODES,
+    STUDENT_BIT,
+    decode_state,
+    event_type,
+)
+from .snapshot import CoordinatorSnapshot, build_compiled, build_state, restore_state, seed_compiled
+from .stats import PerfStats
+from .store import CalendarSources, CalendarStore
 
 _LOGGER = logging.getLogger(__name__)
-SCAN_INTERVAL = timedelta(minutes=60)
+# 兜底轮询间隔：跨天和文件变化已由事件驱动刷新
+SCAN_INTERVAL = timedelta(hours=6)
+# 日历文件变化检查间隔（仅stat，不解析）
+FILE_CHECK_INTERVAL = timedelta(seconds=30)
+
+
+def _code_attributes(code: int) -> Dict[str, Any]:
+    """状态编码 -> 状态与布尔标志"""
+    state, is_student = decode_state(code)
+    return {
+        "state": state.value,
+        ATTR_IS_WORKDAY: state in (WorkdayState.WORKDAY, WorkdayState.WORKDAY_SPECIAL),
+        ATTR_IS_HOLIDAY: state in (WorkdayState.HOLIDAY, WorkdayState.HOLIDAY_CUSTOM),
+        ATTR_IS_WEEKEND: state == WorkdayState.WEEKEND,
+        ATTR_IS_SPECIAL_WORKDAY: state == WorkdayState.WORKDAY_SPECIAL,
+        ATTR_IS_STUDENT_HOLIDAY: is_student,
+    }
+
+
+# 所有状态编码对应的属性（预先生成，批量分类时直接查表）
+_CODE_ATTRIBUTES: Dict[int, Dict[str, Any]] = {
+    code | student: _code_attributes(code | student)
+    for code in range(len(STATE_CODES))
+    for student in (0, STUDENT_BIT)
+}
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DayInfo:
-    """今天的信息数据类"""
+    """今天的信息数据类（不可变，可被缓存共享；事件为索引中的共享记录，不复制）"""
     date: str
     weekday: int
     weekday_name: str
@@ -40,126 +90,175 @@ class DayInfo:
     is_student_holiday: bool  # 独立标志，不影响工作日判断
     mode: HolidayMode
     mode_name: str
-    events: List[Dict] = field(default_factory=list)
-    event_names: List[str] = field(default_factory=list)
+    events: Tuple[EventRecord, ...] = ()
+    event_names: Tuple[str, ...] = ()
     primary_event: str = ""
-    upcoming_days: List[Dict] = field(default_factory=list)
+    upcoming_days: Tuple[Dict, ...] = ()
 
 
 class SmartWorkdayDataManager:
     """数据管理器 - 处理所有数据加载和计算"""
     
-    def __init__(self, hass: HomeAssistant, calendar_path: str):
+    def __init__(self, hass: HomeAssistant, calendar_path: str, sources: Optional[CalendarSources] = None):
         self.hass = hass
         self.calendar_path = calendar_path
-        self._data_cache = None
-        self._last_loaded = None
+        # 解析和索引由各文件的共享存储持有，这里只保存本条目的假期模式
+        self.sources = sources or CalendarSources(hass, [calendar_path], [CalendarStore(calendar_path)])
         self._holiday_mode = HolidayMode.STANDARD
+        # analyze_day 结果的LRU缓存：(日期, 假期模式, 数据版本) -> DayInfo
+        self._day_cache: "OrderedDict[Tuple[date, HolidayMode, int], DayInfo]" = OrderedDict()
+        self._day_cache_version: Optional[int] = None
+        self._day_cache_lock = threading.Lock()
+        self._day_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
         
+    @property
+    def data_version(self) -> int:
+        """日历数据版本"""
+        return self.sources.data_version
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """获取缓存统计"""
+        return self.sources.cache_stats
+
+    @property
+    def day_cache_stats(self) -> Dict[str, Any]:
+        """获取 DayInfo 缓存统计"""
+        lookups = self._day_cache_stats["hits"] + self._day_cache_stats["misses"]
+        return {
+            **self._day_cache_stats,
+            "size": len(self._day_cache),
+            "max_size": DAY_CACHE_SIZE,
+            "hit_rate": round(self._day_cache_stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    @property
+    def holiday_mode(self) -> HolidayMode:
+        """当前假期模式"""
+        return self._holiday_mode
+
     def update_holiday_mode(self, mode: HolidayMode):
-        """更新假期模式"""
+        """更新假期模式（模式变化时清空 DayInfo 缓存）"""
+        if mode != self._holiday_mode:
+            with self._day_cache_lock:
+                self._clear_day_cache()
         self._holiday_mode = mode
-        
+
+    def _clear_day_cache(self) -> None:
+        """清空 DayInfo 缓存（调用方持有锁）"""
+        if self._day_cache:
+            self._day_cache.clear()
+            self._day_cache_stats["invalidations"] += 1
+
     def load_calendar_data(self, force_reload: bool = False) -> Dict:
-        """加载日历数据"""
-        now = dt.now()
-        
-        # 缓存1分钟
-        if not force_reload and self._data_cache and self._last_loaded:
-            if (now - self._last_loaded).total_seconds() < 60:
-                return self._data_cache
-        
-        try:
-            import yaml
-            import os
-            
-            if not os.path.exists(self.calendar_path):
-                return {"holidays": [], "customdays": [], "studentdays": []}
-            
-            with open(self.calendar_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
-                data.setdefault("holidays", [])
-                data.setdefault("customdays", [])
-                data.setdefault("studentdays", [])
-                
-                self._data_cache = data
-                self._last_loaded = now
-                return data
-                
-        except Exception as e:
-            _LOGGER.error("加载日历文件失败: %s", e)
-            return {"holidays": [], "customdays": [], "studentdays": []}
-    
-    def get_today_events(self, check_date: Optional[date] = None) -> List[Dict]:
+        """加载日历数据（所有来源合并）"""
+        return self.sources.load_calendar_data(force_reload)
+
+    def has_file_changed(self) -> bool:
+        """检查日历文件是否变化"""
+        return self.sources.has_file_changed()
+
+    def get_index(self) -> Union[CalendarIndex, CompositeIndex]:
+        """获取日历索引（多个来源时为组合索引）"""
+        return self.sources.get_index()
+
+    def get_today_events(self, check_date: Optional[date] = None) -> List[EventRecord]:
         """获取指定日期的所有事件"""
         if check_date is None:
             check_date = dt.now().date()
-        
-        data = self.load_calendar_data()
-        events = []
-        
-        def is_match(date_obj: date, item: Dict) -> bool:
-            """检查日期是否匹配事件"""
-            try:
-                if "date" in item:
-                    return item["date"] == date_obj.isoformat()
-                elif "start" in item and "end" in item:
-                    start = datetime.strptime(item["start"], "%Y-%m-%d").date()
-                    end = datetime.strptime(item["end"], "%Y-%m-%d").date()
-                    return start <= date_obj <= end
-            except Exception as e:
-                _LOGGER.debug("日期匹配错误: %s", e)
-            return False
-        
-        # 法定节假日
-        for item in data.get("holidays", []):
-            if is_match(check_date, item):
-                events.append({
-                    "name": item.get("name", "节假日"),
-                    "type": "holiday" if "调休" not in item.get("name", "") else "special",
-                })
-        
-        # 自定义假期
-        for item in data.get("customdays", []):
-            if is_match(check_date, item):
-                events.append({
-                    "name": item.get("name", "自定义假期"),
-                    "type": "custom",
-                })
-        
-        # 学生假期 - 独立事件，不影响工作日判断
-        for item in data.get("studentdays", []):
-            if is_match(check_date, item):
-                events.append({
-                    "name": item.get("name", "学生假期"),
-                    "type": "student",
-                })
-        
-        return events
+        return self.get_index().events_on(check_date)
     
-    def analyze_day(self, today: date, events: List[Dict]) -> DayInfo:
+    def get_day_info(self, day: Optional[date] = None) -> DayInfo:
+        """获取指定日期的分析结果 - 按 (日期, 假期模式, 数据版本) 缓存
+
+        命中时不检查文件（文件变化由协调器检测并刷新）；未命中时加载索引，
+        数据版本变化后旧结果整体失效。
+        """
+        if day is None:
+            day = dt.now().date()
+        mode = self._holiday_mode
+        key = (day, mode, self.data_version)
+        with self._day_cache_lock:
+            info = self._day_cache.get(key)
+            if info is not None:
+                self._day_cache.move_to_end(key)
+                self._day_cache_stats["hits"] += 1
+                return info
+            self._day_cache_stats["misses"] += 1
+
+        index = self.get_index()
+        version = self.data_version
+        info = self.analyze_day(day, index.events_on(day))
+        with self._day_cache_lock:
+            if version != self._day_cache_version:
+                self._clear_day_cache()
+                self._day_cache_version = version
+            if mode == self._holiday_mode:
+                self._day_cache[(day, mode, version)] = info
+                if len(self._day_cache) > DAY_CACHE_SIZE:
+                    self._day_cache.popitem(last=False)
+                    self._day_cache_stats["evictions"] += 1
+        return info
+
+    def get_day_state(self, day: date) -> Tuple[WorkdayState, bool]:
+        """查表获取指定日期的 (工作日状态, 是否学生假期)"""
+        return decode_state(self.get_index().state_code(day, self._holiday_mode))
+
+    def get_range_states(self, start: date, end: date) -> bytes:
+        """查表获取日期区间（含首尾）的状态编码，每天一个字节"""
+        return self.get_index().states_between(start, end, self._holiday_mode)
+
+    def classify_range(self, start: date, end: date, mode: Optional[HolidayMode] = None) -> List[Dict]:
+        """批量分类日期区间（含首尾）内的每一天"""
+        index = self.get_index()
+        codes = index.states_between(start, end, mode or self._holiday_mode)
+        day_events = index.events_between(start, end)
+        first = start.toordinal()
+        return [
+            {
+                "date": date.fromordinal(first + offset).isoformat(),
+                **_CODE_ATTRIBUTES[code],
+                "event_names": list(dict.fromkeys(e.name for e in events)),
+            }
+            for offset, (code, events) in enumerate(zip(codes, day_events))
+        ]
+
+    def day_grid(self, start: date, end: date, mode: Optional[HolidayMode] = None) -> List[Tuple[int, str]]:
+        """日期区间（含首尾）内每天的紧凑状态 (状态编码, 事件名称)，用于月历网格"""
+        index = self.get_index()
+        codes = index.states_between(start, end, mode or self._holiday_mode)
+        return [
+            (code, "、".join(dict.fromkeys(e.name for e in events)))
+            for code, events in zip(codes, index.events_between(start, end))
+        ]
+
+    def workdays_between(self, start: date, end: date, mode: Optional[HolidayMode] = None) -> int:
+        """统计 [start, end) 内的工作日数（含调休上班日）"""
+        return self.get_index().workdays_between(start, end, mode or self._holiday_mode)
+
+    def add_workdays(self, day: date, count: int, mode: Optional[HolidayMode] = None) -> date:
+        """计算 day 之后第 count 个工作日（count 为负时向前）"""
+        return self.get_index().add_workdays(day, count, mode or self._holiday_mode)
+
+    def next_workday(self, day: date, mode: Optional[HolidayMode] = None) -> date:
+        """下一个工作日（不含当天）"""
+        return self.add_workdays(day, 1, mode)
+
+    def previous_workday(self, day: date, mode: Optional[HolidayMode] = None) -> date:
+        """上一个工作日（不含当天）"""
+        return self.add_workdays(day, -1, mode)
+
+    def analyze_day(self, today: date, events: List[EventRecord]) -> DayInfo:
         """分析一天的状态"""
+        event_names = [e.name for e in events]
+        kinds = {e.kind for e in events}
         flags = {
-            "holiday": False,
-            "special": False,
-            "custom": False,
-            "student": False,  # 独立标志
+            "holiday": KIND_HOLIDAY in kinds,
+            "special": KIND_SPECIAL in kinds,
+            "custom": KIND_CUSTOM in kinds,
+            "student": KIND_STUDENT in kinds,  # 独立标志，只记录，不影响工作日判断
         }
         
-        event_names = []
-        
-        for e in events:
-            event_names.append(e["name"])
-            
-            if e["type"] == "holiday":
-                flags["holiday"] = True
-            elif e["type"] == "special":
-                flags["special"] = True
-            elif e["type"] == "custom":
-                flags["custom"] = True
-            elif e["type"] == "student":
-                flags["student"] = True  # 只记录，不影响工作日判断
-        
         is_weekend = today.weekday() >= 5
         
         # 工作日判断逻辑（和学生假期无关）
@@ -213,95 +312,220 @@ class SmartWorkdayDataManager:
             is_student_holiday=flags["student"],  # 独立标志
             mode=self._holiday_mode,
             mode_name=self._holiday_mode.display_name,
-            events=events,
-            event_names=list(dict.fromkeys(event_names)),
+            events=tuple(events),
+            event_names=tuple(dict.fromkeys(event_names)),
             primary_event=event_names[0] if event_names else "",
         )
     
-    def get_upcoming_days(self, today: date, days: int = 7) -> List[Dict]:
-        """获取未来几天信息"""
-        upcoming = []
-        for i in range(1, days + 1):
-            future = today + timedelta(days=i)
-            events = self.get_today_events(future)
-            if events:
-                upcoming.append({
-                    "date": future.isoformat(),
-                    "events": [e["name"] for e in events]
-                })
-        return upcoming
+    def get_upcoming_days(self, today: date, days: int = DEFAULT_UPCOMING_DAYS) -> List[Dict]:
+        """获取未来几天内的事件，每个事件按起止日期只返回一次"""
+        rows = self.get_index().rows_between(today + timedelta(days=1), today + timedelta(days=days))
+        return [
+            {
+                "name": name,
+                "type": event_type(section, name),
+                "start": date.fromordinal(start).isoformat(),
+                "end": date.fromordinal(end).isoformat(),
+            }
+            for start, end, section, name in rows
+        ]
     
     def get_calendar_events(self) -> Dict:
         """获取所有日历事件（用于日历实体）"""
-        return self.load_calendar_data(force_reload=True)
+        return self.load_calendar_data()
 
 
 class SmartWorkdayCoordinator(DataUpdateCoordinator):
     """协调器 - 管理数据更新"""
     
-    def __init__(self, hass: HomeAssistant, entry_id: str, data_manager: SmartWorkdayDataManager):
+    def __init__(self, hass: HomeAssistant, entry_id: str, data_manager: SmartWorkdayDataManager,
+                 upcoming_days: int = DEFAULT_UPCOMING_DAYS, snapshot: Optional[CoordinatorSnapshot] = None):
         super().__init__(
             hass,
             _LOGGER,
             name=f"Smart Workday {entry_id}",
             update_interval=SCAN_INTERVAL,
+            # 数据与上次相同时不通知实体
+            always_update=False,
         )
         self.entry_id = entry_id
         self.data_manager = data_manager
+        self.upcoming_days = upcoming_days
+        # 本条目的分类、未来事件和整体刷新耗时
+        self.perf = PerfStats()
+        # 刷新和状态写入计数：未变化的刷新不通知实体，实体状态未变化时不写入
+        self.update_stats: Dict[str, int] = {
+            "refreshes": 0,
+            "refreshes_unchanged": 0,
+            "state_writes": 0,
+            "state_writes_suppressed": 0,
+            "snapshot_restored": 0,
+        }
+        # 启动快照：上次的数据和编译结果，启动时直接使用，随后后台刷新
+        self._snapshot = snapshot
+        self._snapshot_version: Optional[int] = None
+        # 编译快照已与全部日历文件一致时，下次刷新不必重写
+        self._compiled_current = False
+        # 最近一次刷新使用的日历索引（只含已生成的年份），供事件循环中的模板函数只读查询
+        self.index: Optional[BuiltYearsView] = None
+        # 上次通知月历网格订阅时的 (数据版本, 假期模式)
+        self._grid_key: Optional[Tuple[int, HolidayMode]] = None
 
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """更新数据"""
-        try:
-            today = dt.now().date()
-            
-            # 获取当天事件
-            events = await self.hass.async_add_executor_job(
-                self.data_manager.get_today_events, today
+    def _snapshot_config(self) -> List[Any]:
+        """影响协调器数据的配置，变化时快照失效"""
+        return [self.data_manager.holiday_mode.value, self.upcoming_days]
+
+    async def async_restore_snapshot(self) -> bool:
+        """从启动快照恢复数据，快照有效时返回True（调用方随后应在后台刷新）"""
+        if self._snapshot is None:
+            return False
+        with self.perf.time("snapshot_restore"):
+            saved = await self._snapshot.async_load_state()
+            payload = await self.hass.async_add_executor_job(
+                restore_state, self.data_manager.sources, saved, dt.now().date(), self._snapshot_config()
             )
+        if payload is None:
+            return False
+        self.update_stats["snapshot_restored"] += 1
+        self.async_set_updated_data(payload)
+        _LOGGER.debug("已从启动快照恢复: %s", payload.get("date"))
+        return True
+
+    async def async_background_refresh(self) -> None:
+        """快照恢复后的后台刷新：先用编译快照预填日历存储，再完整刷新"""
+        if self._snapshot is not None:
+            compiled = await self._snapshot.async_load_compiled()
+            seeded = await self.hass.async_add_executor_job(seed_compiled, self.data_manager.sources, compiled)
+            self._compiled_current = seeded == len(self.data_manager.sources.stores)
+            _LOGGER.debug("编译快照预填了 %d 个日历文件", seeded)
+        await self.async_refresh()
+
+    def _build_state(self) -> Dict[str, Any]:
+        """生成状态快照（由 Store 延迟调用）"""
+        return build_state(self.data_manager.sources, self.data, self._snapshot_config())
+
+    def _build_compiled(self) -> Dict[str, Any]:
+        """生成编译快照（由 Store 延迟调用）"""
+        return build_compiled(self.data_manager.sources)
+
+    @callback
+    def async_start_listeners(self) -> Callable[[], None]:
+        """在本地零点和日历文件变化时刷新，返回取消函数"""
+        unsubs = [
+            async_track_time_change(self.hass, self._async_handle_midnight, hour=0, minute=0, second=0),
+            async_track_time_interval(self.hass, self._async_check_file, FILE_CHECK_INTERVAL),
+        ]
+
+        @callback
+        def _unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return _unsubscribe
+
+    async def _async_handle_midnight(self, now) -> None:
+        """跨天后立即刷新"""
+        _LOGGER.debug("跨天刷新: %s", now)
+        await self.async_refresh()
+
+    async def _async_check_file(self, now) -> None:
+        """日历文件变化或目录来源中文件增减时刷新"""
+        rescanned, changed = await self.data_manager.sources.async_check_changes()
+        if rescanned:
+            _LOGGER.debug("日历来源文件列表已变化，刷新数据")
+            await self.async_request_refresh()
+        elif changed:
+            _LOGGER.debug("日历文件已变化，刷新数据")
+            await self.async_request_refresh()
+
+    def _compute_update(self, today: date) -> Dict[str, Any]:
+        """在executor中一次完成加载、分类和未来事件计算"""
+        with self.perf.time("load"):
+            index = self.data_manager.get_index()
+            # 预先生成模板函数可查询的年份（next_holiday 最远查到后年），事件循环中只读这些表
+            mode = self.data_manager.holiday_mode
+            for year in range(today.year - TEMPLATE_YEARS_BEFORE, today.year + TEMPLATE_YEARS_AFTER + 1):
+                index.build_year(year, mode)
+            self.index = BuiltYearsView(index, mode)
+
+        with self.perf.time("classify"):
+            day_info = self.data_manager.get_day_info(today)
+
+        with self.perf.time("upcoming"):
+            upcoming = self.data_manager.get_upcoming_days(today, self.upcoming_days)
+
+        return self._build_payload(day_info, upcoming)
+
+    def _compute_day(self, day: date) -> Dict[str, Any]:
+        """在executor中计算任意一天的数据（供服务查询，不替换模板索引、不计入刷新耗时）"""
+        return self._build_payload(
+            self.data_manager.get_day_info(day), self.data_manager.get_upcoming_days(day, self.upcoming_days)
+        )
+
+    @staticmethod
+    def _build_payload(day_info: DayInfo, upcoming: List[Dict]) -> Dict[str, Any]:
+        """由当天分析结果和未来事件生成协调器数据"""
+        return {
+            # 核心状态
+            "state": day_info.state.value,
+            "state_name": day_info.state_name,
             
-            # 分析当天
-            day_info = await self.hass.async_add_executor_job(
-                self.data_manager.analyze_day, today, events
-            )
+            # 日期信息
+            "date": day_info.date,
+            "weekday": day_info.weekday,
+            "weekday_name": day_info.weekday_name,
             
-            # 获取未来事件
-            upcoming = await self.hass.async_add_executor_job(
-                self.data_manager.get_upcoming_days, today
-            )
+            # 布尔标志
+            ATTR_IS_WORKDAY: day_info.is_workday,
+            ATTR_IS_HOLIDAY: day_info.is_holiday,
+            ATTR_IS_WEEKEND: day_info.is_weekend,
+            ATTR_IS_SPECIAL_WORKDAY: day_info.is_special_workday,
+            ATTR_IS_STUDENT_HOLIDAY: day_info.is_student_holiday,  # 独立标志
             
-            # 构建返回数据
-            data = {
-                # 核心状态
-                "state": day_info.state.value,
-                "state_name": day_info.state_name,
-                
-                # 日期信息
-                "date": day_info.date,
-                "weekday": day_info.weekday,
-                "weekday_name": day_info.weekday_name,
-                
-                # 布尔标志
-                ATTR_IS_WORKDAY: day_info.is_workday,
-                ATTR_IS_HOLIDAY: day_info.is_holiday,
-                ATTR_IS_WEEKEND: day_info.is_weekend,
-                ATTR_IS_SPECIAL_WORKDAY: day_info.is_special_workday,
-                ATTR_IS_STUDENT_HOLIDAY: day_info.is_student_holiday,  # 独立标志
-                
-                # 模式信息
-                "mode": day_info.mode.value,
-                "mode_name": day_info.mode_name,
-                
-                # 事件信息
-                "events": day_info.events,
-                "event_names": day_info.event_names,
-                "primary_event": day_info.primary_event,
-                
-                # 未来事件
-                "upcoming": upcoming,
-            }
+            # 模式信息
+            "mode": day_info.mode.value,
+            "mode_name": day_info.mode_name,
             
-            return data
+            # 事件信息
+            "events": [e.as_dict() for e in day_info.events],
+            "event_names": list(day_info.event_names),
+            "primary_event": day_info.primary_event,
             
+            # 未来事件
+            "upcoming": upcoming,
+        }
+
+    async def async_get_day_data(self, day: Optional[date] = None) -> Dict[str, Any]:
+        """获取某天的完整数据（含事件和未来事件列表），当天直接返回已有数据"""
+        if day is None or (self.data and self.data.get("date") == day.isoformat()):
+            if self.data is not None:
+                return self.data
+            day = dt.now().date()
+        return await self.hass.async_add_executor_job(self._compute_day, day)
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """更新数据"""
+        try:
+            with self.perf.time("update"):
+                data = await self.hass.async_add_executor_job(self._compute_update, dt.now().date())
         except Exception as err:
             _LOGGER.error("更新数据失败: %s", err)
-            raise UpdateFailed(f"更新失败: {err}")
\ No newline at end of file
+            raise UpdateFailed(f"更新失败: {err}")
+
+        self.update_stats["refreshes"] += 1
+        version = self.data_manager.data_version
+        if data == self.data:
+            self.update_stats["refreshes_unchanged"] += 1
+        if self._snapshot is not None and (data != self.data or version != self._snapshot_version):
+            compiled_changed = version != self._snapshot_version and not self._compiled_current
+            compiled_func = self._build_compiled if compiled_changed else None
+            self._snapshot_version = version
+            self._snapshot.async_schedule_save(self._build_state, compiled_func)
+        self._compiled_current = False
+
+        grid_key = (version, self.data_manager.holiday_mode)
+        if grid_key != self._grid_key:
+            # 日历数据或假期模式变化（当天数据可能不变），通知月历网格订阅
+            self._grid_key = grid_key
+            async_dispatcher_send(self.hass, SIGNAL_CALENDAR_UPDATED, self.entry_id, self.data_manager)
+        return data
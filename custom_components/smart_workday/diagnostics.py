@@ -0,0 +1,45 @@
+"""Diagnostics support for Smart Workday."""
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_ICS_TOKEN, CONF_REMOTE_URL, DATA_DAY_GRID
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """返回配置条目的诊断信息：刷新耗时、缓存统计和当前数据"""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    sources = entry_data["data_manager"].sources
+
+    return {
+        "config": async_redact_data(dict(entry.data), {CONF_ICS_TOKEN, CONF_REMOTE_URL}),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "timings": coordinator.perf.as_dict(),
+            "update_stats": coordinator.update_stats,
+            "day_cache": entry_data["data_manager"].day_cache_stats,
+            "data": coordinator.data,
+        },
+        "calendar": {
+            "sources": sources.paths,
+            "cache": sources.cache_stats,
+            "timings": sources.perf.as_dict(),
+            "ics": entry_data["ics"].stats,
+            "remote": entry_data["remote"].stats if entry_data["remote"] else None,
+            "day_grid": {**hass.data[DATA_DAY_GRID].stats, "subscriptions": hass.data[DATA_DAY_GRID].subscription_count},
+            "files": [
+                {
+                    "path": store.calendar_path,
+                    "sidecar_path": store.sidecar_path,
+                    "cache": store.cache_stats,
+                    "timings": store.perf.as_dict(),
+                }
+                for store in sources.stores
+            ],
+        },
+    }
@@ -0,0 +1,260 @@
+"""ICS feed for Smart Workday - ICS 订阅"""
+
+import hashlib
+import hmac
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from .const import (
+    DOMAIN,
+    CONF_ICS_TOKEN,
+    ICS_DEFAULT_YEARS_BEFORE,
+    ICS_DEFAULT_YEARS_AFTER,
+    ICS_MAX_YEARS,
+    ICS_URL,
+    HolidayMode,
+    WorkdayState,
+)
+from .coordinator import SmartWorkdayDataManager
+from .index import STATE_CODES, event_type
+
+_LOGGER = logging.getLogger(__name__)
+
+# 每个订阅最多缓存的年度片段数
+_MAX_CACHED_CHUNKS = 512
+
+_SPECIAL_CODE = STATE_CODES.index(WorkdayState.WORKDAY_SPECIAL)
+_STATE_MASK = 0x07
+
+
+def _escape(text: str) -> str:
+    """转义 RFC 5545 文本值"""
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> bytes:
+    """按 75 字节折行（不拆分多字节字符），以 CRLF 结尾"""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return raw + b"\r\n"
+    parts: List[bytes] = []
+    current = b""
+    limit = 75
+    for char in line:
+        encoded = char.encode()
+        if len(current) + len(encoded) > limit:
+            parts.append(current)
+            current = b""
+            # 续行以一个空格开头
+            limit = 74
+        current += encoded
+    parts.append(current)
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def _vevent(uid: str, start: int, end: int, summary: str, description: str,
+            category: str, stamp: str) -> bytes:
+    """生成一个全天 VEVENT（DTEND 为结束日的次日）"""
+    lines = (
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{DOMAIN}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{date.fromordinal(start):%Y%m%d}",
+        f"DTEND;VALUE=DATE:{date.fromordinal(end + 1):%Y%m%d}",
+        f"SUMMARY:{_escape(summary)}",
+        f"DESCRIPTION:{_escape(description)}",
+        f"CATEGORIES:{_escape(category)}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    )
+    return b"".join(_fold(line) for line in lines)
+
+
+def serialize_year(index, year: int, mode: HolidayMode, annotate: bool, stamp: str,
+                   carried: bool = False) -> bytes:
+    """序列化某公历年开始的所有事件（可附带调休上班日标注）
+
+    carried 为True时（请求范围的第一年）还包含更早开始、延续到该年的事件，
+    其余年份只输出当年开始的事件，保证每个事件在订阅中只出现一次。
+    """
+    first = date(year, 1, 1)
+    last = date(year, 12, 31)
+    first_ordinal = first.toordinal()
+    chunks: List[bytes] = []
+    for start, end, section, name in index.rows_between(first, last):
+        if start < first_ordinal and not carried:
+            continue
+        # 与日历实体使用相同的事件ID
+        uid = hashlib.md5(f"{date.fromordinal(start)}_{name}_{section}".encode()).hexdigest()
+        description = "调休上班日" if "调休" in name else f"来源: {section}"
+        chunks.append(_vevent(uid, start, end, name, description, event_type(section, name), stamp))
+
+    if annotate:
+        states = index.year_states(year, mode)
+        for offset, code in enumerate(states):
+            if code & _STATE_MASK != _SPECIAL_CODE:
+                continue
+            ordinal = first_ordinal + offset
+            day = date.fromordinal(ordinal)
+            names = list(dict.fromkeys(e.name for e in index.events_on(day)))
+            summary = f"{'、'.join(names)}上班" if names else "调休上班"
+            uid = hashlib.md5(f"{day}_workday_{mode.value}".encode()).hexdigest()
+            chunks.append(_vevent(uid, ordinal, ordinal, summary, "调休上班日", "workday", stamp))
+    return b"".join(chunks)
+
+
+class IcsFeed:
+    """单个配置条目的 ICS 订阅 - 按年缓存序列化结果，日历内容变化时整体失效"""
+
+    def __init__(self, data_manager: SmartWorkdayDataManager, name: str):
+        self._data_manager = data_manager
+        self._name = name
+        self._digest: Optional[str] = None
+        self._chunks: "OrderedDict[Tuple[int, HolidayMode, bool, bool], bytes]" = OrderedDict()
+        # 片段缓存由事件循环和多个executor任务同时访问
+        self._lock = threading.Lock()
+        self._stamp = ""
+        self.stats = {"requests": 0, "not_modified": 0, "chunks_built": 0, "chunks_cached": 0}
+
+    def prepare(self) -> str:
+        """在executor中检查文件并返回内容摘要，内容变化时清空缓存"""
+        self._data_manager.get_index()
+        digest = self._data_manager.sources.content_digest
+        with self._lock:
+            if digest != self._digest:
+                self._digest = digest
+                self._chunks.clear()
+                self._stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        return digest
+
+    def header(self) -> bytes:
+        """VCALENDAR 头部"""
+        lines = (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:-//Smart Workday//{DOMAIN}//ZH",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_escape(self._name)}",
+            f"X-WR-TIMEZONE:{dt.DEFAULT_TIME_ZONE}",
+        )
+        return b"".join(_fold(line) for line in lines)
+
+    def cached_chunk(self, year: int, annotate: bool, carried: bool = False) -> Optional[bytes]:
+        """获取已缓存的年度片段"""
+        key = (year, self._data_manager.holiday_mode, annotate, carried)
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                self._chunks.move_to_end(key)
+                self.stats["chunks_cached"] += 1
+        return chunk
+
+    def build_chunk(self, year: int, annotate: bool, carried: bool = False) -> bytes:
+        """在executor中序列化并缓存年度片段"""
+        mode = self._data_manager.holiday_mode
+        chunk = serialize_year(self._data_manager.get_index(), year, mode, annotate, self._stamp, carried)
+        with self._lock:
+            self._chunks[(year, mode, annotate, carried)] = chunk
+            if len(self._chunks) > _MAX_CACHED_CHUNKS:
+                self._chunks.popitem(last=False)
+            self.stats["chunks_built"] += 1
+        return chunk
+
+
+def _etag(digest: str, mode: HolidayMode, annotate: bool, start_year: int, end_year: int) -> str:
+    """由内容摘要和请求参数生成弱 ETag（DTSTAMP 不参与比较）"""
+    key = f"{digest}:{mode.value}:{int(annotate)}:{start_year}:{end_year}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:32]}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """检查 If-None-Match 是否命中（弱比较）"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == wanted:
+            return True
+    return False
+
+
+class SmartWorkdayIcsView(HomeAssistantView):
+    """ICS 订阅视图 - 地址中的令牌即访问凭据，便于手机和 Outlook 直接订阅"""
+
+    url = ICS_URL
+    name = f"api:{DOMAIN}:ics"
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+
+    def _find_entry(self, token: str) -> Optional[Dict[str, Any]]:
+        """按令牌查找配置条目的运行数据（常量时间比较，避免通过响应时间猜测令牌）"""
+        for entry_data in self._hass.data.get(DOMAIN, {}).values():
+            expected = entry_data["config"].get(CONF_ICS_TOKEN)
+            if expected and hmac.compare_digest(expected.encode(), token.encode()):
+                return entry_data
+        return None
+
+    @staticmethod
+    def _year_range(request: web.Request) -> Tuple[int, int]:
+        """解析 start_year / end_year 参数"""
+        this_year = dt.now().year
+        start_year = int(request.query.get("start_year", this_year - ICS_DEFAULT_YEARS_BEFORE))
+        end_year = int(request.query.get("end_year", this_year + ICS_DEFAULT_YEARS_AFTER))
+        if not 1 <= start_year <= end_year <= 9998 or end_year - start_year >= ICS_MAX_YEARS:
+            raise ValueError(f"年份范围无效（最多 {ICS_MAX_YEARS} 年）")
+        return start_year, end_year
+
+    async def get(self, request: web.Request, token: str) -> web.StreamResponse:
+        """返回 ICS 订阅，支持 If-None-Match 条件请求"""
+        entry_data = self._find_entry(token)
+        if entry_data is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        try:
+            start_year, end_year = self._year_range(request)
+        except ValueError as e:
+            return web.Response(status=HTTPStatus.BAD_REQUEST, text=str(e))
+        annotate = request.query.get("annotate", "0").lower() in ("1", "true", "yes")
+
+        feed: IcsFeed = entry_data["ics"]
+        feed.stats["requests"] += 1
+        digest = await self._hass.async_add_executor_job(feed.prepare)
+        etag = _etag(digest, entry_data["data_manager"].holiday_mode, annotate, start_year, end_year)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            feed.stats["not_modified"] += 1
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        # 逐年写出：已缓存的片段直接发送，其余在executor中序列化后发送
+        response = web.StreamResponse(headers=headers)
+        response.content_type = "text/calendar"
+        response.charset = "utf-8"
+        await response.prepare(request)
+        await response.write(feed.header())
+        for year in range(start_year, end_year + 1):
+            # 第一年同时输出更早开始、延续到该年的事件（例如跨年的元旦假期）
+            carried = year == start_year
+            chunk = feed.cached_chunk(year, annotate, carried)
+            if chunk is None:
+                chunk = await self._hass.async_add_executor_job(feed.build_chunk, year, annotate, carried)
+            if chunk:
+                await response.write(chunk)
+        await response.write(b"END:VCALENDAR\r\n")
+        await response.write_eof()
+        return response
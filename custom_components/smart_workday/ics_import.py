@@ -0,0 +1,307 @@
+"""ICS import for Smart Workday - 将 ICS 文件流式导入为日历来源"""
+
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from .const import (
+    DOMAIN,
+    CONF_CALENDAR_SOURCES,
+    EVENT_IMPORT_PROGRESS,
+    ICS_IMPORT_DIR,
+    ICS_IMPORT_PROGRESS_EVERY,
+)
+from .index import CALENDAR_SECTIONS, EventRow
+
+_LOGGER = logging.getLogger(__name__)
+
+# 表示调休上班的摘要关键字和分类
+_WORKDAY_KEYWORDS = ("调休", "补班", "上班")
+_WORKDAY_CATEGORIES = {"workday", "special", "调休", "补班", "上班"}
+
+_DURATION = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?")
+
+# 进度回调：(已读取事件数, 已读取字节数, 文件总字节数)
+ProgressCallback = Callable[[int, int, int], None]
+
+
+def _split_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    """拆分内容行为 (属性名, 参数, 值)，参数值中的引号内冒号不作为分隔符"""
+    pos = line.find(":")
+    if pos < 0:
+        return "", {}, ""
+    if '"' in line[:pos]:
+        # 少见情况：带引号的参数值，逐字符查找分隔符
+        quoted = False
+        for pos, char in enumerate(line):
+            if char == '"':
+                quoted = not quoted
+            elif char == ":" and not quoted:
+                break
+        else:
+            return "", {}, ""
+    head, value = line[:pos], line[pos + 1:]
+    if ";" not in head:
+        return head.upper(), {}, value
+    name, *params = head.split(";")
+    parsed = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parsed[key.upper()] = param_value.strip('"')
+    return name.upper(), parsed, value
+
+
+def _unescape(text: str) -> str:
+    """反转义 RFC 5545 文本值"""
+    return (
+        text.replace("\\n", "\n").replace("\\N", "\n")
+        .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+    )
+
+
+def _parse_date(value: str, params: Dict[str, str]) -> Tuple[date, Optional[datetime]]:
+    """解析 DATE 或 DATE-TIME 值，返回 (本地日期, 日期时间；DATE 值为None)"""
+    value = value.strip()
+    day = date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return day, None
+    moment = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        moment = dt.as_local(moment.replace(tzinfo=dt.UTC))
+    return moment.date(), moment
+
+
+def iter_ics_events(path: str, progress: Optional[ProgressCallback] = None) -> Iterator[Dict[str, Any]]:
+    """逐行流式读取 ICS 文件，逐个产出 VEVENT 的属性
+
+    按字节展开折行后再解码（折行可能切断多字节字符），内存中只保留当前事件。
+    """
+    total = os.path.getsize(path)
+    read = 0
+    count = 0
+    event: Optional[Dict[str, Any]] = None
+    pending = b""
+
+    def handle(raw: bytes) -> Optional[Dict[str, Any]]:
+        nonlocal event
+        line = raw.decode("utf-8", errors="replace")
+        name, params, value = _split_property(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {}
+        elif name == "END" and value.upper() == "VEVENT":
+            finished, event = event, None
+            return finished
+        elif event is not None and name:
+            event.setdefault(name, (params, value))
+        return None
+
+    with open(path, "rb") as f:
+        for raw in f:
+            read += len(raw)
+            raw = raw.rstrip(b"\r\n")
+            if raw[:1] in (b" ", b"\t"):
+                pending += raw[1:]
+                continue
+            finished = handle(pending) if pending else None
+            pending = raw
+            if finished is not None:
+                count += 1
+                if progress is not None and count % ICS_IMPORT_PROGRESS_EVERY == 0:
+                    progress(count, read, total)
+                yield finished
+        if pending:
+            finished = handle(pending)
+            if finished is not None:
+                count += 1
+                yield finished
+    if progress is not None:
+        progress(count, read, total)
+
+
+def workday_name(name: str) -> str:
+    """调休上班日的名称：holidays 分类中名称含“调休”即表示调休上班"""
+    return name if "调休" in name else f"{name}（调休）"
+
+
+def event_to_row(event: Dict[str, Any], section: str) -> Optional[EventRow]:
+    """将 VEVENT 映射为事件行：调休上班事件归入 holidays，其余归入指定分类"""
+    if "DTSTART" not in event or "RRULE" in event:
+        return None
+    if event.get("STATUS", ({}, ""))[1].upper() == "CANCELLED":
+        return None
+
+    start, _ = _parse_date(event["DTSTART"][1], event["DTSTART"][0])
+    if "DTEND" in event:
+        end, moment = _parse_date(event["DTEND"][1], event["DTEND"][0])
+        # DTEND 不包含在内：全天事件取前一天，定时事件取结束前一刻所在的日期
+        end = end - timedelta(days=1) if moment is None else (moment - timedelta(seconds=1)).date()
+    elif "DURATION" in event and (match := _DURATION.match(event["DURATION"][1].strip())):
+        days = int(match.group(1) or 0) * 7 + int(match.group(2) or 0)
+        end = start + timedelta(days=max(days, 1) - 1)
+    else:
+        end = start
+    end = max(end, start)
+
+    name = _unescape(event.get("SUMMARY", ({}, ""))[1]).strip() or "导入事件"
+    categories = {
+        category.strip().lower()
+        for category in _unescape(event.get("CATEGORIES", ({}, ""))[1]).split(",")
+    }
+    if categories & _WORKDAY_CATEGORIES or any(keyword in name for keyword in _WORKDAY_KEYWORDS) or name == "班":
+        return (start.toordinal(), end.toordinal(), "holidays", workday_name(name))
+    return (start.toordinal(), end.toordinal(), section, name)
+
+
+def _yaml_item(row: EventRow) -> str:
+    """事件行 -> YAML 列表项（字符串使用 JSON 双引号格式，同样是合法的 YAML）"""
+    start, end, _, name = row
+    if start == end:
+        head = f'  - date: "{date.fromordinal(start).isoformat()}"\n'
+    else:
+        head = (
+            f'  - start: "{date.fromordinal(start).isoformat()}"\n'
+            f'    end: "{date.fromordinal(end).isoformat()}"\n'
+        )
+    return f"{head}    name: {json.dumps(name, ensure_ascii=False)}\n"
+
+
+def import_ics(source: str, output: str, section: str, existing: Set[EventRow],
+               progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """流式导入 ICS 文件并写出规范化的日历 YAML（在executor中运行）
+
+    每个分类先写入各自的临时文件，最后拼接并原子替换目标文件；
+    与已有来源或本次导入中重复的事件只保留一次。
+    """
+    if section not in CALENDAR_SECTIONS:
+        raise ValueError(f"未知分类: {section}")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    stats = {"events_read": 0, "imported": 0, "duplicates": 0, "skipped": 0}
+    counts = {name: 0 for name in CALENDAR_SECTIONS}
+    seen = set(existing)
+    parts = {name: f"{output}.{name}.tmp" for name in CALENDAR_SECTIONS}
+    tmp_path = f"{output}.tmp"
+    handles: Dict[str, Any] = {}
+    try:
+        try:
+            for name, path in parts.items():
+                handles[name] = open(path, "w", encoding="utf-8")
+            for event in iter_ics_events(source, progress):
+                stats["events_read"] += 1
+                try:
+                    row = event_to_row(event, section)
+                except ValueError as e:
+                    _LOGGER.debug("跳过无法解析的 ICS 事件: %s", e)
+                    row = None
+                if row is None:
+                    stats["skipped"] += 1
+                    continue
+                if row in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(row)
+                handles[row[2]].write(_yaml_item(row))
+                counts[row[2]] += 1
+                stats["imported"] += 1
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write(f"# 由 {DOMAIN}.import_ics 从 {os.path.basename(source)} 导入，重新导入时会覆盖本文件\n")
+            for name, path in parts.items():
+                out.write(f"{name}:{'' if counts[name] else ' []'}\n")
+                with open(path, "r", encoding="utf-8") as part:
+                    while chunk := part.read(1 << 16):
+                        out.write(chunk)
+        os.replace(tmp_path, output)
+    finally:
+        for path in (*parts.values(), tmp_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {**stats, "sections": counts, "output": output}
+
+
+def _check_path(hass: HomeAssistant, path: str) -> None:
+    """只允许访问配置目录或 allowlist_external_dirs 中的文件"""
+    config_dir = os.path.realpath(hass.config.config_dir)
+    real = os.path.realpath(path)
+    if os.path.commonpath((config_dir, real)) != config_dir and not hass.config.is_allowed_path(real):
+        raise ValueError(f"不允许访问该路径: {path}")
+
+
+def import_output_path(hass: HomeAssistant, source: str, output: Optional[str] = None) -> Tuple[str, str]:
+    """导入结果的 (来源配置中的相对路径, 绝对路径)，只能写入集成目录的 imported 子目录
+
+    output 只能是文件名（.yaml/.yml，不含路径分隔符或 ..），默认使用 ICS 文件名。
+    """
+    name = (output or f"{os.path.splitext(os.path.basename(source))[0]}.yaml").strip()
+    name = name.removeprefix(f"{ICS_IMPORT_DIR}/")
+    if (
+        not name
+        or os.path.isabs(name)
+        or "/" in name
+        or "\\" in name
+        or ".." in name
+        or name.startswith(".")
+        or not name.lower().endswith((".yaml", ".yml"))
+    ):
+        raise ValueError(f"输出文件只能是 {ICS_IMPORT_DIR} 目录中的 YAML 文件名: {output or name}")
+    relative = f"{ICS_IMPORT_DIR}/{name}"
+    return relative, hass.config.path("custom_components", DOMAIN, ICS_IMPORT_DIR, name)
+
+
+async def async_import_ics(hass: HomeAssistant, entry: ConfigEntry, source: str, section: str,
+                           output: Optional[str] = None) -> Dict[str, Any]:
+    """导入 ICS 文件到配置条目：与该条目其它来源去重，并把结果加入附加来源
+
+    返回导入统计；结果文件已是来源时由文件变化检测自动生效，否则由调用方决定是否重新加载条目。
+    """
+    source_path = hass.config.path("custom_components", DOMAIN, source)
+    relative, output_path = import_output_path(hass, source_path, output)
+    _check_path(hass, source_path)
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+
+    def existing_rows() -> Set[EventRow]:
+        """其它来源中的事件行（重新导入时忽略目标文件本身）"""
+        if entry_data is None:
+            return set()
+        target = os.path.realpath(output_path)
+        return {
+            tuple(row)
+            for store in entry_data["data_manager"].sources.stores
+            if store.calendar_path != target
+            for row in store.get_index().rows
+        }
+
+    def progress(count: int, read: int, total: int) -> None:
+        _LOGGER.info("ICS 导入进度 %s: %d 个事件，%d/%d 字节", source_path, count, read, total)
+        hass.bus.fire(EVENT_IMPORT_PROGRESS, {
+            "entry_id": entry.entry_id,
+            "source": source_path,
+            "events": count,
+            "bytes_read": read,
+            "bytes_total": total,
+        })
+
+    def run() -> Dict[str, Any]:
+        return import_ics(source_path, output_path, section, existing_rows(), progress)
+
+    result = await hass.async_add_executor_job(run)
+    sources: List[str] = list(entry.data.get(CONF_CALENDAR_SOURCES, []))
+    result["source"] = relative
+    result["added_source"] = relative not in sources
+    if result["added_source"]:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_CALENDAR_SOURCES: sources + [relative]}
+        )
+    _LOGGER.info("ICS 导入完成 %s -> %s: %s", source_path, output_path, result)
+    return result
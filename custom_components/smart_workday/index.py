@@ -0,0 +1,662 @@
+"""Calendar index for Smart Workday - 预编译日期索引"""
+
+import calendar
+import logging
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .const import HolidayMode, WorkdayState
+from .rules import RecurringRule, expand_rule, parse_rule, rule_to_item
+
+_LOGGER = logging.getLogger(__name__)
+
+# 日历分类（按输出顺序）
+CALENDAR_SECTIONS: Tuple[str, ...] = ("holidays", "customdays", "studentdays")
+
+# 分类默认名称
+_DEFAULT_NAMES: Dict[str, str] = {
+    "holidays": "节假日",
+    "customdays": "自定义假期",
+    "studentdays": "学生假期",
+}
+
+# 规范化事件行：(开始序号, 结束序号, 分类, 名称)
+EventRow = Tuple[int, int, str, str]
+
+# 日期标志位
+FLAG_WEEKEND = 0x01
+FLAG_HOLIDAY = 0x02
+FLAG_SPECIAL = 0x04
+FLAG_CUSTOM = 0x08
+FLAG_STUDENT = 0x10
+
+# 事件类型编码（EventRecord.kind），KIND_NAMES 为对应的类型名称
+KIND_HOLIDAY = 0
+KIND_SPECIAL = 1
+KIND_CUSTOM = 2
+KIND_STUDENT = 3
+KIND_NAMES: Tuple[str, ...] = ("holiday", "special", "custom", "student")
+
+# 类型编码 -> 分类顺序，合并多组事件时保持分类顺序
+_KIND_RANK: Tuple[int, ...] = (0, 0, 1, 2)
+
+# 类型编码 -> 标志位
+KIND_FLAGS: Tuple[int, ...] = (FLAG_HOLIDAY, FLAG_SPECIAL, FLAG_CUSTOM, FLAG_STUDENT)
+
+# 状态编码：低3位为状态序号，第4位为学生假期
+STATE_CODES: Tuple[WorkdayState, ...] = tuple(WorkdayState)
+STUDENT_BIT = 0x08
+_STATE_MASK = 0x07
+
+
+def classify_flags(flags: int, mode: HolidayMode) -> WorkdayState:
+    """根据日期标志判断工作日状态（与 analyze_day 规则一致）"""
+    if flags & FLAG_SPECIAL:
+        return WorkdayState.WORKDAY_SPECIAL
+    if mode == HolidayMode.STANDARD:
+        has_holiday = flags & (FLAG_HOLIDAY | FLAG_CUSTOM)
+    else:
+        has_holiday = flags & FLAG_CUSTOM
+    if has_holiday:
+        return WorkdayState.HOLIDAY_CUSTOM if flags & FLAG_CUSTOM else WorkdayState.HOLIDAY
+    if flags & FLAG_WEEKEND:
+        return WorkdayState.WEEKEND
+    return WorkdayState.WORKDAY
+
+
+def _state_table(mode: HolidayMode) -> bytes:
+    """生成标志 -> 状态编码的转换表（用于 bytes.translate）"""
+    return bytes(
+        STATE_CODES.index(classify_flags(flags, mode)) | (STUDENT_BIT if flags & FLAG_STUDENT else 0)
+        for flags in range(256)
+    )
+
+
+_STATE_TABLES: Dict[HolidayMode, bytes] = {mode: _state_table(mode) for mode in HolidayMode}
+
+# 状态编码 -> 是否工作日（0/1），用于生成前缀和
+_WORKDAY_CODES = (
+    STATE_CODES.index(WorkdayState.WORKDAY),
+    STATE_CODES.index(WorkdayState.WORKDAY_SPECIAL),
+)
+_WORKDAY_TABLE = bytes(1 if code & _STATE_MASK in _WORKDAY_CODES else 0 for code in range(256))
+
+# 状态编码 -> 是否节假日（0/1，不含普通周末），用于查找下一个节假日
+_HOLIDAY_CODES = (
+    STATE_CODES.index(WorkdayState.HOLIDAY),
+    STATE_CODES.index(WorkdayState.HOLIDAY_CUSTOM),
+)
+_HOLIDAY_TABLE = bytes(1 if code & _STATE_MASK in _HOLIDAY_CODES else 0 for code in range(256))
+
+# 按星期排列的周末标志，周一开始
+_WEEKEND_WEEK = bytes([0, 0, 0, 0, 0, FLAG_WEEKEND, FLAG_WEEKEND])
+_ONES = b"\x01" * 366
+
+
+def decode_state(code: int) -> Tuple[WorkdayState, bool]:
+    """解码状态字节 -> (工作日状态, 是否学生假期)"""
+    return STATE_CODES[code & _STATE_MASK], bool(code & STUDENT_BIT)
+
+
+def to_ordinal(value: Any) -> int:
+    """将日期字符串或日期对象转换为序号"""
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(value, "%Y-%m-%d").date().toordinal()
+
+
+def event_kind(section: str, name: str) -> int:
+    """根据分类和名称得到事件类型编码"""
+    if section == "holidays":
+        return KIND_SPECIAL if "调休" in name else KIND_HOLIDAY
+    if section == "customdays":
+        return KIND_CUSTOM
+    return KIND_STUDENT
+
+
+def event_type(section: str, name: str) -> str:
+    """根据分类和名称得到事件类型"""
+    return KIND_NAMES[event_kind(section, name)]
+
+
+def intern_row(row: Sequence) -> EventRow:
+    """还原事件行，分类和名称使用驻留字符串（相同名称只保存一份）"""
+    start, end, section, name = row
+    return (start, end, sys.intern(section), sys.intern(name))
+
+
+class EventRecord:
+    """索引中的事件记录 - 固定槽位，类型为整数编码，名称与事件行共享同一个驻留字符串
+
+    seq 为事件在日历文件中的顺序，用于合并同一天的事件。
+    """
+
+    __slots__ = ("seq", "start", "end", "kind", "name")
+
+    def __init__(self, seq: int, start: int, end: int, kind: int, name: str):
+        self.seq = seq
+        self.start = start
+        self.end = end
+        self.kind = kind
+        self.name = name
+
+    @property
+    def type(self) -> str:
+        """事件类型名称"""
+        return KIND_NAMES[self.kind]
+
+    def as_dict(self) -> Dict[str, str]:
+        """转换为 {"name", "type"} 字典（用于状态属性）"""
+        return {"name": self.name, "type": KIND_NAMES[self.kind]}
+
+    def __repr__(self) -> str:
+        return f"EventRecord({self.name!r}, {KIND_NAMES[self.kind]}, {self.start}-{self.end})"
+
+
+def normalize_calendar(data: Dict) -> List[EventRow]:
+    """将YAML数据规范化为事件行列表，跳过无效条目"""
+    rows: List[EventRow] = []
+    for section in CALENDAR_SECTIONS:
+        for item in data.get(section) or []:
+            try:
+                name = sys.intern(str(item.get("name", _DEFAULT_NAMES[section])))
+                if "rule" in item:
+                    continue
+                if "date" in item:
+                    start = end = to_ordinal(item["date"])
+                elif "start" in item and "end" in item:
+                    start = to_ordinal(item["start"])
+                    end = to_ordinal(item["end"])
+                else:
+                    continue
+            except (AttributeError, TypeError, ValueError) as e:
+                _LOGGER.debug("跳过无效日历条目 %s: %s", item, e)
+                continue
+            if end < start:
+                _LOGGER.debug("跳过结束早于开始的条目: %s", item)
+                continue
+            rows.append((start, end, section, name))
+    return rows
+
+
+def normalize_rules(data: Dict) -> List[RecurringRule]:
+    """从YAML数据中提取周期规则条目，跳过无效条目"""
+    rules: List[RecurringRule] = []
+    for section in CALENDAR_SECTIONS:
+        for item in data.get(section) or []:
+            if not isinstance(item, dict) or "rule" not in item:
+                continue
+            try:
+                name = str(item.get("name", _DEFAULT_NAMES[section]))
+                rules.append(parse_rule(section, name, item))
+            except (KeyError, TypeError, ValueError) as e:
+                _LOGGER.debug("跳过无效规则条目 %s: %s", item, e)
+    return rules
+
+
+def rows_to_calendar(rows: List[EventRow], rules: Sequence[RecurringRule] = ()) -> Dict:
+    """将事件行和周期规则还原为YAML结构的日历数据"""
+    data: Dict[str, List[Dict]] = {section: [] for section in CALENDAR_SECTIONS}
+    for start, end, section, name in rows:
+        if start == end:
+            item = {"date": date.fromordinal(start).isoformat(), "name": name}
+        else:
+            item = {
+                "start": date.fromordinal(start).isoformat(),
+                "end": date.fromordinal(end).isoformat(),
+                "name": name,
+            }
+        data[section].append(item)
+    for rule in rules:
+        data[rule.section].append(rule_to_item(rule))
+    return data
+
+
+_SEQ = attrgetter("seq")
+_START = itemgetter(0)
+
+
+def _merge(single: Tuple[EventRecord, ...], ranged: Tuple[EventRecord, ...]) -> List[EventRecord]:
+    """按文件顺序合并单天事件和范围事件"""
+    if not single:
+        return list(ranged)
+    if not ranged:
+        return list(single)
+    return sorted(single + ranged, key=_SEQ)
+
+
+def _merge_sections(events: List[EventRecord], extra: List[EventRecord]) -> List[EventRecord]:
+    """合并两组事件：按分类顺序排列，同分类内保持先后顺序"""
+    if not extra:
+        return events
+    if not events:
+        return extra
+    return sorted(events + extra, key=lambda e: _KIND_RANK[e.kind])
+
+
+class _YearTables(ABC):
+    """按年状态表的公共查询：子类提供 year_flags，这里派生状态、前缀和与工作日计算"""
+
+    def __init__(self):
+        self._year_states: Dict[Tuple[int, HolidayMode], bytes] = {}
+        self._year_prefix: Dict[Tuple[int, HolidayMode], array] = {}
+
+    @abstractmethod
+    def year_flags(self, year: int) -> bytes:
+        """获取某年的日期标志表，每天一个字节"""
+
+    def year_states(self, year: int, mode: HolidayMode) -> bytes:
+        """获取某年某模式的状态编码表，每天一个字节"""
+        key = (year, mode)
+        states = self._year_states.get(key)
+        if states is None:
+            states = self._year_states[key] = self.year_flags(year).translate(_STATE_TABLES[mode])
+        return states
+
+    def state_code(self, day: date, mode: HolidayMode) -> int:
+        """获取指定日期的状态编码"""
+        return self.year_states(day.year, mode)[day.timetuple().tm_yday - 1]
+
+    def states_between(self, start: date, end: date, mode: HolidayMode) -> bytes:
+        """获取日期区间（含首尾）的状态编码"""
+        if end < start:
+            return b""
+        chunks = []
+        for year in range(start.year, end.year + 1):
+            states = self.year_states(year, mode)
+            lo = start.timetuple().tm_yday - 1 if year == start.year else 0
+            hi = end.timetuple().tm_yday if year == end.year else len(states)
+            chunks.append(states[lo:hi])
+        return b"".join(chunks)
+
+    def year_prefix(self, year: int, mode: HolidayMode) -> array:
+        """获取某年工作日前缀和：prefix[i] 为当年前 i 天的工作日数"""
+        key = (year, mode)
+        prefix = self._year_prefix.get(key)
+        if prefix is None:
+            workdays = self.year_states(year, mode).translate(_WORKDAY_TABLE)
+            prefix = self._year_prefix[key] = array("H", accumulate(workdays, initial=0))
+        return prefix
+
+    def workdays_between(self, start: date, end: date, mode: HolidayMode) -> int:
+        """统计 [start, end) 内的工作日数，end 早于 start 时返回负数"""
+        if end < start:
+            return -self.workdays_between(end, start, mode)
+        total = 0
+        for year in range(start.year, end.year + 1):
+            prefix = self.year_prefix(year, mode)
+            lo = start.timetuple().tm_yday - 1 if year == start.year else 0
+            hi = end.timetuple().tm_yday - 1 if year == end.year else len(prefix) - 1
+            total += prefix[hi] - prefix[lo]
+        return total
+
+    def add_workdays(self, day: date, count: int, mode: HolidayMode) -> date:
+        """返回 day 之后（count 为负时为之前）的第 count 个工作日，count 为 0 时返回 day"""
+        if count == 0:
+            return day
+
+        year = day.year
+        pos = day.timetuple().tm_yday - 1
+        if count > 0:
+            # 从 day 的次日开始计数
+            prefix = self.year_prefix(year, mode)
+            target = prefix[pos + 1] + count
+            while target > prefix[-1]:
+                target -= prefix[-1]
+                year += 1
+                prefix = self.year_prefix(year, mode)
+        else:
+            # 从 day 的前一天开始倒数
+            prefix = self.year_prefix(year, mode)
+            target = prefix[pos] + count + 1
+            while target < 1:
+                year -= 1
+                prefix = self.year_prefix(year, mode)
+                target += prefix[-1]
+
+        # 第一个前缀和达到目标的位置即为该工作日的次日
+        return date(year, 1, 1) + timedelta(days=bisect_left(prefix, target) - 1)
+
+    def build_year(self, year: int, mode: HolidayMode) -> None:
+        """预先生成某年的状态表、前缀和与规则子索引（在executor中调用，供只读视图查询）"""
+        self.year_prefix(year, mode)
+        self.build_rule_index(year)
+
+    def build_rule_index(self, year: int) -> None:
+        """预先生成某年的规则子索引"""
+
+    def next_holiday(self, day: date, mode: HolidayMode, years: int = 2) -> Optional[date]:
+        """返回 day 当天或之后的第一个节假日（不含普通周末），最多向后查找 years 年"""
+        pos = day.timetuple().tm_yday - 1
+        for year in range(day.year, day.year + years + 1):
+            found = self.year_states(year, mode).translate(_HOLIDAY_TABLE).find(1, pos)
+            if found >= 0:
+                return date(year, 1, 1) + timedelta(days=found)
+            pos = 0
+        return None
+
+
+class CalendarIndex(_YearTables):
+    """日历索引 - 单天事件哈希表 + 范围事件分段表
+
+    范围事件按起止点切分为若干不重叠的区段，每个区段预先保存覆盖它的事件，
+    查询时只需一次二分查找，不再解析任何日期字符串。
+
+    周期规则不会预先展开：每个公历年在首次被查询时展开一次并缓存，
+    作为该年的附加子索引参与查询。
+    """
+
+    def __init__(self, rows: List[EventRow], rules: Sequence[RecurringRule] = ()):
+        super().__init__()
+        self.rows = rows
+        self.rules = tuple(rules)
+
+        # 每行一个事件记录，单天表和区段表共享同一批记录
+        self._records: List[EventRecord] = [
+            EventRecord(seq, start, end, event_kind(section, name), name)
+            for seq, (start, end, section, name) in enumerate(rows)
+        ]
+
+        # 单天事件：序号 -> 事件记录
+        single: Dict[int, List[EventRecord]] = {}
+        ranges: List[EventRecord] = []
+        for record in self._records:
+            if record.start == record.end:
+                single.setdefault(record.start, []).append(record)
+            else:
+                ranges.append(record)
+        self._single: Dict[int, Tuple[EventRecord, ...]] = {
+            day: tuple(entries) for day, entries in single.items()
+        }
+
+        # 范围事件：区段边界 + 每个区段内生效的事件
+        self._bounds = array("l")
+        self._segments: List[Tuple[EventRecord, ...]] = []
+        self._build_segments(ranges)
+
+        # 按开始日期排序的事件行（稳定排序，同一天保持文件顺序），用于时间窗口查询
+        self._by_start: List[EventRow] = sorted(rows, key=_START)
+        self._starts = array("l", (row[0] for row in self._by_start))
+        self._max_span: int = max((end - start for start, end, _, _ in rows), default=0)
+
+        # 按年的状态表（按需生成）
+        self._records_by_year: Optional[Dict[int, List[EventRecord]]] = None
+        self._year_flags: Dict[int, bytes] = {}
+
+        # 周期规则展开结果（按需生成）：当年开始的事件行、与当年重叠的事件行、当年子索引
+        self._rule_starts: Dict[int, List[EventRow]] = {}
+        self._rule_rows: Dict[int, List[EventRow]] = {}
+        self._rule_index: Dict[int, "CalendarIndex"] = {}
+
+    @property
+    def parts(self) -> Tuple["CalendarIndex", ...]:
+        """组成本索引的单文件索引"""
+        return (self,)
+
+    def _build_segments(self, ranges: List[EventRecord]) -> None:
+        """扫描线构建区段表"""
+        opening: Dict[int, List[EventRecord]] = {}
+        closing: Dict[int, List[int]] = {}
+        for record in ranges:
+            opening.setdefault(record.start, []).append(record)
+            closing.setdefault(record.end + 1, []).append(record.seq)
+
+        active: Dict[int, EventRecord] = {}
+        for bound in sorted(opening.keys() | closing.keys()):
+            for seq in closing.get(bound, ()):
+                active.pop(seq, None)
+            for record in opening.get(bound, ()):
+                active[record.seq] = record
+            self._bounds.append(bound)
+            self._segments.append(tuple(sorted(active.values(), key=_SEQ)))
+
+    def _range_entries(self, ordinal: int) -> Tuple[EventRecord, ...]:
+        """获取覆盖指定日期的范围事件"""
+        pos = bisect_right(self._bounds, ordinal) - 1
+        if pos < 0:
+            return ()
+        return self._segments[pos]
+
+    def events_on(self, day: date) -> List[EventRecord]:
+        """获取指定日期的所有事件（保持日历文件中的顺序）"""
+        ordinal = day.toordinal()
+        events = _merge(self._single.get(ordinal, ()), self._range_entries(ordinal))
+        if self.rules:
+            events = _merge_sections(events, self.rule_index(day.year).events_on(day))
+        return events
+
+    def events_between(self, start: date, end: date) -> List[List[EventRecord]]:
+        """一次扫描获取日期区间（含首尾）内每天的事件"""
+        first = start.toordinal()
+        last = end.toordinal()
+        bounds = self._bounds
+        segments = self._segments
+        pos = bisect_right(bounds, first) - 1
+        ranged = segments[pos] if pos >= 0 else ()
+
+        result: List[List[EventRecord]] = []
+        for ordinal in range(first, last + 1):
+            # 跨过区段边界时前移指针
+            while pos + 1 < len(bounds) and bounds[pos + 1] <= ordinal:
+                pos += 1
+                ranged = segments[pos]
+            result.append(_merge(self._single.get(ordinal, ()), ranged))
+
+        if self.rules and result:
+            extra: List[List[EventRecord]] = []
+            for year in range(start.year, end.year + 1):
+                lo = start if year == start.year else date(year, 1, 1)
+                hi = end if year == end.year else date(year, 12, 31)
+                extra.extend(self.rule_index(year).events_between(lo, hi))
+            result = [_merge_sections(events, more) for events, more in zip(result, extra)]
+        return result
+
+    def rows_between(self, start: date, end: date) -> List[EventRow]:
+        """获取与日期区间（含首尾）重叠的事件行，按开始日期排序，每个事件只出现一次"""
+        first = start.toordinal()
+        last = end.toordinal()
+        lo = bisect_left(self._starts, first - self._max_span)
+        hi = bisect_right(self._starts, last)
+        rows = [row for row in self._by_start[lo:hi] if row[1] >= first]
+        if self.rules and first <= last:
+            # 上一年开始的规则事件可能延续到查询区间内
+            extra = [
+                row
+                for year in range(start.year - 1, end.year + 1)
+                for row in self.rule_starts(year)
+                if row[1] >= first and row[0] <= last
+            ]
+            if extra:
+                rows = sorted(rows + extra, key=_START)
+        return rows
+
+    def rule_starts(self, year: int) -> List[EventRow]:
+        """获取周期规则在某公历年内开始的事件行（每年只展开一次）"""
+        rows = self._rule_starts.get(year)
+        if rows is None:
+            rows = [
+                (start, end, rule.section, rule.name)
+                for rule in self.rules
+                for start, end in expand_rule(rule, year)
+            ]
+            rows.sort(key=_START)
+            self._rule_starts[year] = rows
+        return rows
+
+    def rule_rows(self, year: int) -> List[EventRow]:
+        """获取与某公历年重叠的规则事件行（含上一年开始并跨年的事件）"""
+        rows = self._rule_rows.get(year)
+        if rows is None:
+            first = date(year, 1, 1).toordinal()
+            carried = [row for row in self.rule_starts(year - 1) if row[1] >= first]
+            rows = self._rule_rows[year] = carried + self.rule_starts(year)
+        return rows
+
+    def build_rule_index(self, year: int) -> None:
+        """预先生成某年的规则子索引"""
+        if self.rules:
+            self.rule_index(year)
+
+    def rule_index(self, year: int) -> "CalendarIndex":
+        """获取某公历年规则事件的子索引"""
+        index = self._rule_index.get(year)
+        if index is None:
+            index = self._rule_index[year] = CalendarIndex(self.rule_rows(year))
+        return index
+
+    def _bucket_records(self) -> Dict[int, List[EventRecord]]:
+        """一次遍历，将事件记录按年份分桶
+
+        分桶在局部字典中完成后一次性赋值，多个线程同时生成不同年份的标志表时
+        不会读到未填完的分桶。
+        """
+        buckets = self._records_by_year
+        if buckets is None:
+            buckets = {}
+            for record in self._records:
+                first = date.fromordinal(record.start).year
+                last = date.fromordinal(record.end).year
+                for year in range(first, last + 1):
+                    buckets.setdefault(year, []).append(record)
+            self._records_by_year = buckets
+        return buckets
+
+    def year_flags(self, year: int) -> bytes:
+        """获取某年的日期标志表，每天一个字节"""
+        flags = self._year_flags.get(year)
+        if flags is not None:
+            return flags
+
+        buckets = self._bucket_records()
+
+        first = date(year, 1, 1).toordinal()
+        days = 366 if calendar.isleap(year) else 365
+        offset = date(year, 1, 1).weekday()
+        combined = int.from_bytes((_WEEKEND_WEEK * 54)[offset:offset + days], "little")
+
+        # 每种事件类型一层 0/1 字节，整层乘以标志位后合并（每字节不会进位）
+        layers: List[Optional[bytearray]] = [None] * len(KIND_NAMES)
+        spans = [(r.start, r.end, r.kind) for r in buckets.get(year, ())]
+        if self.rules:
+            spans.extend(
+                (start, end, event_kind(section, name)) for start, end, section, name in self.rule_rows(year)
+            )
+        for start, end, kind in spans:
+            layer = layers[kind]
+            if layer is None:
+                layer = layers[kind] = bytearray(days)
+            lo = max(start - first, 0)
+            hi = min(end - first + 1, days)
+            layer[lo:hi] = _ONES[:hi - lo]
+        for kind, layer in enumerate(layers):
+            if layer is not None:
+                combined |= int.from_bytes(layer, "little") * KIND_FLAGS[kind]
+
+        flags = self._year_flags[year] = combined.to_bytes(days, "little")
+        return flags
+
+
+class CompositeIndex(_YearTables):
+    """多文件组合索引 - 由各文件的独立索引组合而成
+
+    单个文件变化时只需重建该文件的索引，其余文件的索引（含已生成的
+    年度标志表）原样复用；组合索引的年度表由各文件的标志表按位或得到。
+    """
+
+    def __init__(self, parts: Sequence[CalendarIndex]):
+        super().__init__()
+        self.parts: Tuple[CalendarIndex, ...] = tuple(parts)
+        self.rows: List[EventRow] = [row for part in self.parts for row in part.rows]
+        self.rules: Tuple[RecurringRule, ...] = tuple(rule for part in self.parts for rule in part.rules)
+        self._year_flags: Dict[int, bytes] = {}
+
+    def events_on(self, day: date) -> List[EventRecord]:
+        """获取指定日期的所有事件（按分类排列，同分类内按文件顺序）"""
+        events: List[EventRecord] = []
+        for part in self.parts:
+            events = _merge_sections(events, part.events_on(day))
+        return events
+
+    def events_between(self, start: date, end: date) -> List[List[EventRecord]]:
+        """获取日期区间（含首尾）内每天的事件"""
+        result: List[List[EventRecord]] = []
+        for part in self.parts:
+            days = part.events_between(start, end)
+            result = [_merge_sections(events, more) for events, more in zip(result, days)] if result else days
+        return result
+
+    def rows_between(self, start: date, end: date) -> List[EventRow]:
+        """获取与日期区间（含首尾）重叠的事件行，按开始日期排序"""
+        return sorted((row for part in self.parts for row in part.rows_between(start, end)),
+                      key=_START)
+
+    def rule_starts(self, year: int) -> List[EventRow]:
+        """获取周期规则在某公历年内开始的事件行"""
+        return sorted((row for part in self.parts for row in part.rule_starts(year)),
+                      key=_START)
+
+    def build_rule_index(self, year: int) -> None:
+        """预先生成各文件某年的规则子索引"""
+        for part in self.parts:
+            part.build_rule_index(year)
+
+    def year_flags(self, year: int) -> bytes:
+        """合并各文件的年度标志表（按位或）"""
+        flags = self._year_flags.get(year)
+        if flags is None:
+            tables = [part.year_flags(year) for part in self.parts]
+            combined = 0
+            for table in tables:
+                combined |= int.from_bytes(table, "little")
+            flags = self._year_flags[year] = combined.to_bytes(len(tables[0]), "little")
+        return flags
+
+
+class YearNotBuilt(LookupError):
+    """只读视图查询了尚未生成状态表的年份"""
+
+
+class BuiltYearsView(_YearTables):
+    """索引的只读视图 - 只使用已由 build_year 生成的年度表，供事件循环中查询
+
+    查询尚未生成的年份时抛出 YearNotBuilt，不会在事件循环中展开规则或生成状态表。
+    """
+
+    def __init__(self, index: Union[CalendarIndex, CompositeIndex], mode: HolidayMode):
+        super().__init__()
+        self._index = index
+        self.mode = mode
+
+    def year_flags(self, year: int) -> bytes:
+        """获取已生成的日期标志表"""
+        flags = self._index._year_flags.get(year)
+        if flags is None:
+            raise YearNotBuilt(year)
+        return flags
+
+    def year_states(self, year: int, mode: HolidayMode) -> bytes:
+        """获取已生成的状态编码表"""
+        states = self._index._year_states.get((year, mode))
+        if states is None:
+            raise YearNotBuilt(year)
+        return states
+
+    def year_prefix(self, year: int, mode: HolidayMode) -> array:
+        """获取已生成的工作日前缀和"""
+        prefix = self._index._year_prefix.get((year, mode))
+        if prefix is None:
+            raise YearNotBuilt(year)
+        return prefix
+
+    def events_on(self, day: date) -> List[EventRecord]:
+        """获取指定日期的所有事件（该年必须已生成）"""
+        self.year_states(day.year, self.mode)
+        return self._index.events_on(day)
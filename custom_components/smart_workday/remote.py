@@ -0,0 +1,297 @@
+"""Remote holiday source for Smart Workday - 远程节假日来源同步"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import yaml
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt
+
+from .const import (
+    DOMAIN,
+    REMOTE_DIR,
+    REMOTE_MAX_BYTES,
+    REMOTE_RETRY_MAX,
+    REMOTE_RETRY_MIN,
+    REMOTE_SYNC_INTERVAL,
+    REMOTE_TIMEOUT,
+)
+from .ics_import import event_to_row, iter_ics_events, workday_name
+from .index import CALENDAR_SECTIONS, EventRow, normalize_calendar, normalize_rules, rows_to_calendar, to_ordinal
+from .store import sidecar_path
+
+_LOGGER = logging.getLogger(__name__)
+
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def remote_paths(hass: HomeAssistant, entry_id: str) -> Tuple[str, str]:
+    """远程来源的 (日历输出文件, 缓存元数据文件) 路径"""
+    directory = hass.config.path("custom_components", DOMAIN, REMOTE_DIR)
+    return os.path.join(directory, f"{entry_id}.yaml"), os.path.join(directory, f".{entry_id}.meta.json")
+
+
+def remove_remote_cache(hass: HomeAssistant, entry_id: str) -> None:
+    """删除远程来源的日历文件、元数据和旁路缓存（在executor中运行）"""
+    output, meta = remote_paths(hass, entry_id)
+    for path in (output, meta, sidecar_path(output)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _merge_days(days: Iterable[EventRow]) -> List[EventRow]:
+    """合并同一分类、同名的连续日期为区间"""
+    merged: List[EventRow] = []
+    for start, end, section, name in sorted(days, key=lambda row: (row[2], row[3], row[0])):
+        if merged:
+            last_start, last_end, last_section, last_name = merged[-1]
+            if (last_section, last_name) == (section, name) and start <= last_end + 1:
+                merged[-1] = (last_start, max(last_end, end), section, name)
+                continue
+        merged.append((start, end, section, name))
+    merged.sort(key=lambda row: (row[0], row[1]))
+    return merged
+
+
+def _parse_day_list(days: List[Dict[str, Any]]) -> List[EventRow]:
+    """holiday-cn 格式：[{"name", "date", "isOffDay"}]，isOffDay 为 false 表示调休上班"""
+    rows = []
+    for item in days:
+        try:
+            day = to_ordinal(item["date"])
+            name = str(item.get("name") or "节假日").strip()
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            _LOGGER.debug("跳过无效的远程日期条目 %s: %s", item, e)
+            continue
+        rows.append((day, day, "holidays", name if item.get("isOffDay", True) else workday_name(name)))
+    return _merge_days(rows)
+
+
+def parse_remote(path: str) -> Dict[str, Any]:
+    """解析下载的远程数据文件为日历数据（在executor中运行）
+
+    支持 ICS、holiday-cn 风格的 JSON（{"days": [...]} 或日期条目列表）
+    以及与日历YAML相同结构的 JSON；无法识别时抛出 ValueError。
+    """
+    with open(path, "rb") as f:
+        head = f.read(512).lstrip(b"\xef\xbb\xbf \t\r\n")
+    if head[:15].upper() == b"BEGIN:VCALENDAR":
+        rows = []
+        for event in iter_ics_events(path):
+            try:
+                row = event_to_row(event, "holidays")
+            except ValueError as e:
+                _LOGGER.debug("跳过无法解析的 ICS 事件: %s", e)
+                continue
+            if row is not None:
+                rows.append(row)
+        return rows_to_calendar(sorted(set(rows)))
+
+    with open(path, "r", encoding="utf-8-sig") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"无法识别的远程数据（既不是 ICS 也不是 JSON）: {e}") from e
+    if isinstance(data, dict) and isinstance(data.get("days"), list):
+        return rows_to_calendar(_parse_day_list(data["days"]))
+    if isinstance(data, list):
+        return rows_to_calendar(_parse_day_list(data))
+    if isinstance(data, dict) and any(section in data for section in CALENDAR_SECTIONS):
+        return rows_to_calendar(normalize_calendar(data), normalize_rules(data))
+    raise ValueError("无法识别的远程 JSON 结构")
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    """读取缓存元数据，不存在或损坏时返回空字典"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    """写入临时文件后原子替换"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class RemoteSource:
+    """远程节假日来源 - 定期下载 JSON 或 ICS，转换为日历文件供数据管理器作为附加来源加载
+
+    使用条件请求（If-None-Match / If-Modified-Since），304 只更新统计；
+    下载或解析失败时保留上次的日历文件并按指数退避重试。
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, url: str,
+                 on_change: Callable[[], Awaitable[None]], session: Optional[aiohttp.ClientSession] = None):
+        self._hass = hass
+        self._entry_id = entry_id
+        self.url = url
+        self._on_change = on_change
+        self._session = session
+        self.output_path, self._meta_path = remote_paths(hass, entry_id)
+        self._lock = asyncio.Lock()
+        self._failures = 0
+        self._cancel_timer: Optional[CALLBACK_TYPE] = None
+        self._stopped = False
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "not_modified": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "errors": 0,
+            "last_status": None,
+            "last_error": None,
+            "last_success": None,
+            "next_sync": None,
+        }
+
+    def _load_meta(self) -> Dict[str, Any]:
+        """读取缓存元数据；地址变化或日历文件缺失时视为无缓存（在executor中运行）"""
+        meta = _read_json(self._meta_path)
+        if meta.get("url") != self.url or not os.path.exists(self.output_path):
+            return {}
+        return meta
+
+    def _apply(self, body: bytes, meta: Dict[str, Any]) -> bool:
+        """解析下载内容并写入日历文件和元数据，返回日历内容是否变化（在executor中运行）
+
+        解析失败时抛出 ValueError，已有的日历文件和元数据保持不变。
+        """
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        body_path = f"{self.output_path}.download"
+        try:
+            with open(body_path, "wb") as f:
+                f.write(body)
+            data = parse_remote(body_path)
+        finally:
+            if os.path.exists(body_path):
+                os.remove(body_path)
+
+        header = f"# 由 {DOMAIN} 从远程来源同步，下次同步时会覆盖本文件\n"
+        content = (header + yaml.dump(data, Dumper=_YAML_DUMPER, allow_unicode=True, sort_keys=False)).encode("utf-8")
+        try:
+            with open(self.output_path, "rb") as f:
+                changed = f.read() != content
+        except OSError:
+            changed = True
+        if changed:
+            _write_atomic(self.output_path, content)
+        _write_atomic(self._meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        return changed
+
+    async def _async_fetch(self, cached: Dict[str, Any]) -> Tuple[int, Optional[bytes], Dict[str, Any]]:
+        """发送条件请求，返回 (状态码, 内容；304 时为None, 新的元数据)"""
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        session = self._session or async_get_clientsession(self._hass)
+        async with session.get(self.url, headers=headers, timeout=aiohttp.ClientTimeout(total=REMOTE_TIMEOUT)) as resp:
+            if resp.status == 304:
+                return resp.status, None, cached
+            resp.raise_for_status()
+            if (resp.content_length or 0) > REMOTE_MAX_BYTES:
+                raise ValueError(f"远程数据过大: {resp.content_length} 字节")
+            chunks = []
+            size = 0
+            async for chunk in resp.content.iter_chunked(1 << 16):
+                size += len(chunk)
+                if size > REMOTE_MAX_BYTES:
+                    raise ValueError(f"远程数据超过 {REMOTE_MAX_BYTES} 字节")
+                chunks.append(chunk)
+            meta = {
+                "url": self.url,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
+            return resp.status, b"".join(chunks), meta
+
+    async def async_sync(self) -> Dict[str, Any]:
+        """同步一次并安排下一次同步，返回本次结果"""
+        async with self._lock:
+            self.stats["requests"] += 1
+            result: Dict[str, Any] = {"changed": False}
+            try:
+                cached = await self._hass.async_add_executor_job(self._load_meta)
+                status, body, meta = await self._async_fetch(cached)
+                self.stats["last_status"] = status
+                if body is None:
+                    self.stats["not_modified"] += 1
+                    result["status"] = "not_modified"
+                else:
+                    meta["synced"] = dt.utcnow().isoformat()
+                    changed = await self._hass.async_add_executor_job(self._apply, body, meta)
+                    self.stats["updated" if changed else "unchanged"] += 1
+                    result.update(status="updated" if changed else "unchanged", changed=changed, bytes=len(body))
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError) as e:
+                self._failures += 1
+                self.stats["errors"] += 1
+                self.stats["last_error"] = f"{type(e).__name__}: {e}"
+                _LOGGER.warning("同步远程节假日来源失败（第 %d 次），继续使用已缓存的数据: %s", self._failures, e)
+                result.update(status="error", error=self.stats["last_error"])
+            else:
+                self._failures = 0
+                self.stats["last_success"] = dt.utcnow().isoformat()
+            self._schedule(self._next_delay())
+            result["next_sync"] = self.stats["next_sync"]
+
+        if result["changed"]:
+            _LOGGER.debug("远程节假日来源已更新: %s", self.output_path)
+            await self._on_change()
+        return result
+
+    def _next_delay(self) -> float:
+        """下次同步的延迟（秒）：成功后按同步间隔（加少量随机抖动），失败后指数退避"""
+        if self._failures:
+            return min(REMOTE_RETRY_MIN * 2 ** (self._failures - 1), REMOTE_RETRY_MAX)
+        return REMOTE_SYNC_INTERVAL + random.uniform(0, REMOTE_SYNC_INTERVAL / 10)
+
+    @callback
+    def _cancel(self) -> None:
+        """取消已安排的同步"""
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+
+    @callback
+    def _schedule(self, delay: float) -> None:
+        """取消已安排的同步并在 delay 秒后重新同步"""
+        self._cancel()
+        if self._stopped:
+            return
+        self._cancel_timer = async_call_later(self._hass, delay, self._async_scheduled)
+        self.stats["next_sync"] = (dt.utcnow() + timedelta(seconds=delay)).isoformat()
+
+    @callback
+    def _async_scheduled(self, _now) -> None:
+        """定时同步（在后台任务中执行，不阻塞调用方）"""
+        self._cancel_timer = None
+        self._hass.async_create_background_task(self.async_sync(), f"{DOMAIN}_remote_{self._entry_id}")
+
+    async def async_start(self) -> CALLBACK_TYPE:
+        """开始定期同步，返回停止函数；已有缓存时延迟首次同步，避免拖慢启动"""
+        self._stopped = False
+        cached = await self._hass.async_add_executor_job(os.path.exists, self.output_path)
+        self._schedule(REMOTE_RETRY_MIN if cached else 0)
+        return self.async_stop
+
+    @callback
+    def async_stop(self) -> None:
+        """停止定期同步"""
+        self._stopped = True
+        self._cancel()
+        self.stats["next_sync"] = None
@@ -0,0 +1,136 @@
+"""Recurring holiday rules for Smart Workday - 周期性假期规则"""
+
+import calendar
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .lunar import lunar_to_ordinal
+
+# 规则类型
+RULE_FIXED = "fixed"        # 每年固定公历日期，如植树节 3月12日
+RULE_WEEKDAY = "weekday"    # 某月第几个星期几，如母亲节 5月第2个周日
+RULE_LUNAR = "lunar"        # 农历日期，如中秋节 八月十五
+RULE_KINDS: Tuple[str, ...] = (RULE_FIXED, RULE_WEEKDAY, RULE_LUNAR)
+
+# 单次事件最长天数
+MAX_RULE_DAYS = 366
+
+
+class RecurringRule(NamedTuple):
+    """规范化后的周期规则（可直接序列化为JSON数组）"""
+
+    section: str
+    name: str
+    kind: str
+    month: int
+    day: int = 1          # fixed/lunar：日期，lunar 为负数时从月末倒数
+    weekday: int = 0      # weekday：1=周一 … 7=周日
+    nth: int = 0          # weekday：第几个，负数表示倒数第几个
+    days: int = 1         # 每次持续天数
+    since: int = 1        # 生效的首个公历年
+    until: int = 9999     # 生效的最后一个公历年
+
+
+def _int(item: Dict, key: str, default: Optional[int] = None) -> int:
+    """读取整数字段，缺失且无默认值时抛出 KeyError"""
+    value = item.get(key, default)
+    if value is None:
+        raise KeyError(key)
+    if isinstance(value, bool):
+        raise TypeError(f"{key} 必须是整数")
+    return int(value)
+
+
+def parse_rule(section: str, name: str, item: Dict[str, Any]) -> RecurringRule:
+    """将YAML规则条目解析为 RecurringRule，条目无效时抛出 ValueError/TypeError/KeyError"""
+    kind = item["rule"]
+    if kind not in RULE_KINDS:
+        raise ValueError(f"未知规则类型: {kind}")
+
+    month = _int(item, "month")
+    if not 1 <= month <= 12:
+        raise ValueError(f"月份超出范围: {month}")
+    fields: Dict[str, int] = {}
+    if kind == RULE_FIXED:
+        # 按闰年校验，2月29日只在闰年展开
+        fields["day"] = _int(item, "day")
+        date(2000, month, fields["day"])
+    elif kind == RULE_WEEKDAY:
+        fields["weekday"] = _int(item, "weekday")
+        fields["nth"] = _int(item, "nth")
+        if not 1 <= fields["weekday"] <= 7:
+            raise ValueError(f"星期超出范围: {fields['weekday']}")
+        if fields["nth"] == 0 or not -5 <= fields["nth"] <= 5:
+            raise ValueError(f"序数超出范围: {fields['nth']}")
+    else:
+        fields["day"] = _int(item, "day")
+        if fields["day"] == 0 or not -30 <= fields["day"] <= 30:
+            raise ValueError(f"农历日期超出范围: {fields['day']}")
+
+    days = _int(item, "days", 1)
+    if not 1 <= days <= MAX_RULE_DAYS:
+        raise ValueError(f"持续天数超出范围: {days}")
+    since = _int(item, "since", 1)
+    until = _int(item, "until", 9999)
+    if until < since:
+        raise ValueError("结束年份早于开始年份")
+    return RecurringRule(section, name, kind, month, days=days, since=since, until=until, **fields)
+
+
+def rule_to_item(rule: RecurringRule) -> Dict[str, Any]:
+    """将规则还原为YAML条目"""
+    item: Dict[str, Any] = {"rule": rule.kind, "month": rule.month}
+    if rule.kind == RULE_WEEKDAY:
+        item["weekday"] = rule.weekday
+        item["nth"] = rule.nth
+    else:
+        item["day"] = rule.day
+    if rule.days != 1:
+        item["days"] = rule.days
+    if rule.since != 1:
+        item["since"] = rule.since
+    if rule.until != 9999:
+        item["until"] = rule.until
+    item["name"] = rule.name
+    return item
+
+
+def _start_ordinals(rule: RecurringRule, year: int) -> List[int]:
+    """规则在某公历年内的所有开始日期序号"""
+    if rule.kind == RULE_FIXED:
+        if not calendar.isleap(year) and (rule.month, rule.day) == (2, 29):
+            return []
+        return [date(year, rule.month, rule.day).toordinal()]
+
+    if rule.kind == RULE_WEEKDAY:
+        first_weekday, month_days = calendar.monthrange(year, rule.month)
+        first = (rule.weekday - 1 - first_weekday) % 7 + 1
+        if rule.nth > 0:
+            day = first + (rule.nth - 1) * 7
+        else:
+            day = first + ((month_days - first) // 7 + rule.nth + 1) * 7
+        if not 1 <= day <= month_days:
+            return []
+        return [date(year, rule.month, day).toordinal()]
+
+    # 农历腊月可能落在下一个公历年，因此同时检查上一农历年
+    first = date(year, 1, 1).toordinal()
+    last = date(year, 12, 31).toordinal()
+    starts = []
+    for lunar_year in (year - 1, year):
+        ordinal = lunar_to_ordinal(lunar_year, rule.month, rule.day)
+        if ordinal is not None and first <= ordinal <= last:
+            starts.append(ordinal)
+    return starts
+
+
+def expand_rule(rule: RecurringRule, year: int) -> List[Tuple[int, int]]:
+    """展开规则在某公历年内开始的所有事件 -> [(开始序号, 结束序号)]"""
+    if not rule.since <= year <= rule.until or not 1 <= year <= 9999:
+        return []
+    try:
+        starts = _start_ordinals(rule, year)
+    except (ValueError, OverflowError):
+        return []
+    limit = date.max.toordinal()
+    return [(start, min(start + rule.days - 1, limit)) for start in starts]
@@ -0,0 +1,227 @@
+"""Services for Smart Workday."""
+
+import inspect
+import logging
+from datetime import date
+from typing import Any, Callable, Dict, Tuple
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+
+from .const import (
+    DOMAIN,
+    HolidayMode,
+    SERVICE_CLASSIFY_RANGE,
+    SERVICE_ADD_WORKDAYS,
+    SERVICE_WORKDAYS_BETWEEN,
+    SERVICE_NEXT_WORKDAY,
+    SERVICE_PREVIOUS_WORKDAY,
+    SERVICE_GET_DAY_DETAILS,
+    SERVICE_IMPORT_ICS,
+    SERVICE_SYNC_REMOTE,
+    ATTR_DATE,
+    ATTR_DAYS,
+    ATTR_START_DATE,
+    ATTR_END_DATE,
+    ATTR_MODE,
+    ATTR_ENTRY_ID,
+    ATTR_PATH,
+    ATTR_SECTION,
+    ATTR_OUTPUT,
+    ATTR_EVENTS,
+    ATTR_UPCOMING,
+    MAX_RANGE_DAYS,
+)
+from .coordinator import SmartWorkdayCoordinator, SmartWorkdayDataManager
+from .ics_import import async_import_ics
+from .index import CALENDAR_SECTIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+_BASE_SCHEMA = {
+    vol.Optional(ATTR_MODE): vol.In([mode.value for mode in HolidayMode]),
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+}
+
+CLASSIFY_RANGE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_START_DATE): cv.date,
+    vol.Required(ATTR_END_DATE): cv.date,
+    **_BASE_SCHEMA,
+})
+
+WORKDAYS_BETWEEN_SCHEMA = CLASSIFY_RANGE_SCHEMA
+
+ADD_WORKDAYS_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DATE): cv.date,
+    vol.Required(ATTR_DAYS): vol.All(vol.Coerce(int), vol.Range(min=-MAX_RANGE_DAYS, max=MAX_RANGE_DAYS)),
+    **_BASE_SCHEMA,
+})
+
+STEP_WORKDAY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DATE): cv.date,
+    **_BASE_SCHEMA,
+})
+
+DAY_DETAILS_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DATE): cv.date,
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+})
+
+IMPORT_ICS_SCHEMA = vol.Schema({
+    vol.Required(ATTR_PATH): cv.string,
+    vol.Optional(ATTR_SECTION, default="holidays"): vol.In(CALENDAR_SECTIONS),
+    vol.Optional(ATTR_OUTPUT): cv.string,
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+})
+
+SYNC_REMOTE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+})
+
+
+# 管理员服务从 HA 2024.8 起才支持返回响应，旧版本只执行不返回
+_ADMIN_RESPONSE = "supports_response" in inspect.signature(async_register_admin_service).parameters
+
+
+def _get_entry_data(hass: HomeAssistant, entry_id: str = None) -> Dict[str, Any]:
+    """获取配置条目的运行数据，未指定时使用第一个条目"""
+    entries = hass.data.get(DOMAIN, {})
+    entry = entries.get(entry_id) if entry_id else next(iter(entries.values()), None)
+    if entry is None:
+        raise ServiceValidationError(f"未找到 Smart Workday 配置条目: {entry_id or '无'}")
+    return entry
+
+
+def _get_data_manager(hass: HomeAssistant, entry_id: str = None) -> SmartWorkdayDataManager:
+    """获取配置条目的数据管理器"""
+    return _get_entry_data(hass, entry_id)["data_manager"]
+
+
+def _resolve(hass: HomeAssistant, call: ServiceCall) -> Tuple[SmartWorkdayDataManager, HolidayMode]:
+    """解析服务调用的数据管理器和假期模式"""
+    data_manager = _get_data_manager(hass, call.data.get(ATTR_ENTRY_ID))
+    return data_manager, HolidayMode(call.data.get(ATTR_MODE, data_manager.holiday_mode))
+
+
+async def _async_date_job(hass: HomeAssistant, func: Callable[..., Any], *args: Any) -> Any:
+    """在executor中执行日期计算，涉及的日期超出公元 1-9999 年时转换为服务校验错误"""
+    try:
+        return await hass.async_add_executor_job(func, *args)
+    except (ValueError, OverflowError) as e:
+        raise ServiceValidationError(f"计算结果超出支持的日期范围（公元 1-9999 年）: {e}") from e
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """注册服务"""
+
+    async def async_classify_range(call: ServiceCall) -> ServiceResponse:
+        """批量分类日期区间"""
+        start = call.data[ATTR_START_DATE]
+        end = call.data[ATTR_END_DATE]
+        if end < start:
+            raise ServiceValidationError("结束日期不能早于开始日期")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise ServiceValidationError(f"日期区间不能超过 {MAX_RANGE_DAYS} 天")
+
+        data_manager, mode = _resolve(hass, call)
+        days = await _async_date_job(hass, data_manager.classify_range, start, end, mode)
+        return {"mode": mode.value, "days": days}
+
+    async def async_workdays_between(call: ServiceCall) -> ServiceResponse:
+        """统计两个日期之间的工作日数"""
+        data_manager, mode = _resolve(hass, call)
+        count = await _async_date_job(
+            hass, data_manager.workdays_between, call.data[ATTR_START_DATE], call.data[ATTR_END_DATE], mode
+        )
+        return {"mode": mode.value, "workdays": count}
+
+    async def async_add_workdays(call: ServiceCall) -> ServiceResponse:
+        """计算N个工作日后的日期"""
+        data_manager, mode = _resolve(hass, call)
+        result = await _async_date_job(hass, data_manager.add_workdays, call.data[ATTR_DATE], call.data[ATTR_DAYS], mode)
+        return {"mode": mode.value, ATTR_DATE: result.isoformat()}
+
+    async def async_next_workday(call: ServiceCall) -> ServiceResponse:
+        """下一个工作日"""
+        data_manager, mode = _resolve(hass, call)
+        result = await _async_date_job(hass, data_manager.next_workday, call.data[ATTR_DATE], mode)
+        return {"mode": mode.value, ATTR_DATE: result.isoformat()}
+
+    async def async_previous_workday(call: ServiceCall) -> ServiceResponse:
+        """上一个工作日"""
+        data_manager, mode = _resolve(hass, call)
+        result = await _async_date_job(hass, data_manager.previous_workday, call.data[ATTR_DATE], mode)
+        return {"mode": mode.value, ATTR_DATE: result.isoformat()}
+
+    async def async_get_day_details(call: ServiceCall) -> ServiceResponse:
+        """某天的完整事件和未来事件列表（不写入状态属性的数据）"""
+        coordinator: SmartWorkdayCoordinator = _get_entry_data(hass, call.data.get(ATTR_ENTRY_ID))["coordinator"]
+        day = call.data.get(ATTR_DATE)
+        if day is not None and (date.max - day).days < coordinator.upcoming_days:
+            raise ServiceValidationError(f"日期之后的 {coordinator.upcoming_days} 天超出支持的日期范围（公元 1-9999 年）")
+        data = await coordinator.async_get_day_data(day)
+        return {
+            ATTR_DATE: data["date"],
+            "state": data["state"],
+            "mode": data["mode"],
+            ATTR_EVENTS: data[ATTR_EVENTS],
+            "event_names": data["event_names"],
+            ATTR_UPCOMING: data[ATTR_UPCOMING],
+        }
+
+    async def async_import(call: ServiceCall) -> ServiceResponse:
+        """流式导入 ICS 文件为附加日历来源"""
+        entry_id = call.data.get(ATTR_ENTRY_ID) or next(iter(hass.data.get(DOMAIN, {})), None)
+        entry = hass.config_entries.async_get_entry(entry_id) if entry_id else None
+        if entry is None or entry_id not in hass.data.get(DOMAIN, {}):
+            raise ServiceValidationError(f"未找到 Smart Workday 配置条目: {entry_id or '无'}")
+        try:
+            result = await async_import_ics(
+                hass, entry, call.data[ATTR_PATH], call.data[ATTR_SECTION], call.data.get(ATTR_OUTPUT)
+            )
+        except ValueError as e:
+            raise ServiceValidationError(str(e)) from e
+        except OSError as e:
+            raise HomeAssistantError(f"导入 ICS 文件失败: {e}") from e
+        if result["added_source"]:
+            # 新来源需要重新加载条目
+            await hass.config_entries.async_reload(entry.entry_id)
+        else:
+            await hass.data[DOMAIN][entry.entry_id]["coordinator"].async_request_refresh()
+        return result
+
+    async def async_sync_remote(call: ServiceCall) -> ServiceResponse:
+        """立即同步远程节假日来源"""
+        remote = _get_entry_data(hass, call.data.get(ATTR_ENTRY_ID))["remote"]
+        if remote is None:
+            raise ServiceValidationError("该配置条目未设置远程来源地址")
+        result = await remote.async_sync()
+        return {**result, "stats": dict(remote.stats)}
+
+    # 导入和同步会写入集成目录中的文件，只允许管理员调用
+    for service, handler, schema in (
+        (SERVICE_IMPORT_ICS, async_import, IMPORT_ICS_SCHEMA),
+        (SERVICE_SYNC_REMOTE, async_sync_remote, SYNC_REMOTE_SCHEMA),
+    ):
+        if _ADMIN_RESPONSE:
+            async_register_admin_service(
+                hass, DOMAIN, service, handler, schema, supports_response=SupportsResponse.OPTIONAL
+            )
+        else:
+            async_register_admin_service(hass, DOMAIN, service, handler, schema)
+
+    for service, handler, schema in (
+        (SERVICE_CLASSIFY_RANGE, async_classify_range, CLASSIFY_RANGE_SCHEMA),
+        (SERVICE_WORKDAYS_BETWEEN, async_workdays_between, WORKDAYS_BETWEEN_SCHEMA),
+        (SERVICE_ADD_WORKDAYS, async_add_workdays, ADD_WORKDAYS_SCHEMA),
+        (SERVICE_NEXT_WORKDAY, async_next_workday, STEP_WORKDAY_SCHEMA),
+        (SERVICE_PREVIOUS_WORKDAY, async_previous_workday, STEP_WORKDAY_SCHEMA),
+        (SERVICE_GET_DAY_DETAILS, async_get_day_details, DAY_DETAILS_SCHEMA),
+    ):
+        hass.services.async_register(
+            DOMAIN, service, handler, schema=schema, supports_response=SupportsResponse.ONLY
+        )
@@ -0,0 +1,124 @@
+"""Persisted startup snapshot for Smart Workday - 启动快照"""
+
+import logging
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .index import intern_row
+from .rules import RecurringRule
+from .store import CalendarSources
+
+_LOGGER = logging.getLogger(__name__)
+
+# 快照格式版本，数据结构变化时递增
+SNAPSHOT_VERSION = 1
+# 延迟保存（秒），合并短时间内的多次刷新
+SNAPSHOT_SAVE_DELAY = 10
+
+
+def _file_fingerprints(sources: CalendarSources) -> List[List[Any]]:
+    """各日历文件的 [路径, 状态指纹]"""
+    return [[store.calendar_path, store.stat_fingerprint()] for store in sources.stores]
+
+
+def build_state(sources: CalendarSources, payload: Dict[str, Any], config_key: List[Any]) -> Dict[str, Any]:
+    """生成状态快照：协调器数据 + 各日历文件的指纹"""
+    return {
+        "date": payload["date"],
+        "config": config_key,
+        "files": _file_fingerprints(sources),
+        "payload": payload,
+    }
+
+
+def build_compiled(sources: CalendarSources) -> Dict[str, Any]:
+    """生成编译快照：各日历文件的规范化事件行和周期规则"""
+    return {"files": [compiled for compiled in (store.export_compiled() for store in sources.stores) if compiled]}
+
+
+def restore_state(sources: CalendarSources, state: Optional[Dict[str, Any]],
+                  today: date, config_key: List[Any]) -> Optional[Dict[str, Any]]:
+    """校验状态快照（日期、配置、文件列表和文件指纹），有效时返回协调器数据"""
+    if not state:
+        return None
+    try:
+        if state["date"] != today.isoformat() or state["config"] != config_key:
+            return None
+        current = _file_fingerprints(sources)
+        saved = [[path, tuple(fingerprint) if fingerprint else None] for path, fingerprint in state["files"]]
+        if saved != current:
+            return None
+        return state["payload"]
+    except (KeyError, TypeError, ValueError) as e:
+        _LOGGER.debug("启动快照无效: %s", e)
+        return None
+
+
+def seed_compiled(sources: CalendarSources, compiled: Optional[Dict[str, Any]]) -> int:
+    """用编译快照预填指纹仍然一致的文件存储，返回预填的文件数"""
+    if not compiled:
+        return 0
+    stores = {store.calendar_path: store for store in sources.stores}
+    seeded = 0
+    try:
+        for item in compiled["files"]:
+            store = stores.get(item["path"])
+            fingerprint = tuple(item["fingerprint"]) if item["fingerprint"] else None
+            if store is None or fingerprint != store.stat_fingerprint():
+                continue
+            store.seed(
+                fingerprint,
+                item["sha1"],
+                [intern_row(row) for row in item["rows"]],
+                [RecurringRule(*rule) for rule in item["rules"]],
+            )
+            seeded += 1
+    except (KeyError, TypeError, ValueError) as e:
+        _LOGGER.debug("编译快照无效: %s", e)
+    return seeded
+
+
+class CoordinatorSnapshot:
+    """协调器启动快照 - 使用 HA Store 持久化，每个配置条目一份
+
+    状态快照很小，启动时同步读取并直接作为实体数据；编译快照包含全部
+    事件行，只在随后的后台刷新前读取，用于跳过YAML和旁路缓存的加载。
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._state: Store = Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+        self._compiled: Store = Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.{entry_id}.compiled")
+
+    @staticmethod
+    async def _async_load(store: Store) -> Optional[Dict[str, Any]]:
+        """读取快照，不存在或损坏时返回None"""
+        try:
+            return await store.async_load()
+        except Exception as e:  # 快照只是加速手段，任何读取错误都回退为正常刷新
+            _LOGGER.debug("读取启动快照失败: %s", e)
+            return None
+
+    async def async_load_state(self) -> Optional[Dict[str, Any]]:
+        """读取状态快照"""
+        return await self._async_load(self._state)
+
+    async def async_load_compiled(self) -> Optional[Dict[str, Any]]:
+        """读取编译快照"""
+        return await self._async_load(self._compiled)
+
+    @callback
+    def async_schedule_save(self, state_func: Callable[[], Dict[str, Any]],
+                            compiled_func: Optional[Callable[[], Dict[str, Any]]] = None) -> None:
+        """延迟保存快照，编译结果只在日历数据变化时保存"""
+        self._state.async_delay_save(state_func, SNAPSHOT_SAVE_DELAY)
+        if compiled_func is not None:
+            self._compiled.async_delay_save(compiled_func, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """删除快照文件"""
+        await self._state.async_remove()
+        await self._compiled.async_remove()
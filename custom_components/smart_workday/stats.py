@@ -0,0 +1,75 @@
+"""Performance statistics for Smart Workday - 耗时统计"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+# 直方图桶上界（毫秒）
+_BUCKETS_MS: Tuple[float, ...] = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class TimingHistogram:
+    """耗时直方图 - 固定桶计数 + 汇总值"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.buckets: List[int] = [0] * (len(_BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms: float) -> None:
+        """记录一次耗时"""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for pos, bound in enumerate(_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[pos] += 1
+                return
+        self.buckets[-1] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """导出为诊断数据"""
+        buckets = {f"<={bound}ms": n for bound, n in zip(_BUCKETS_MS, self.buckets)}
+        buckets[f">{_BUCKETS_MS[-1]}ms"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+            "buckets": buckets,
+        }
+
+
+class PerfStats:
+    """按阶段统计耗时（可在executor线程中使用）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, TimingHistogram] = {}
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        """记录某阶段的一次耗时"""
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = TimingHistogram()
+            histogram.record(elapsed_ms)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """计时上下文"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """导出所有阶段"""
+        with self._lock:
+            return {stage: histogram.as_dict() for stage, histogram in self._stages.items()}
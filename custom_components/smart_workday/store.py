@@ -0,0 +1,433 @@
+"""Shared calendar store for Smart Workday - 共享的日历解析与索引"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import yaml
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_CALENDARS
+from .stats import PerfStats
+from .index import (
+    CALENDAR_SECTIONS,
+    CalendarIndex,
+    CompositeIndex,
+    EventRow,
+    intern_row,
+    normalize_calendar,
+    normalize_rules,
+    rows_to_calendar,
+)
+from .rules import RecurringRule
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# 旁路缓存格式版本，规范化格式变化时递增
+SIDECAR_VERSION = 2
+
+# 目录来源中作为日历文件读取的扩展名
+CALENDAR_EXTENSIONS = (".yaml", ".yml")
+
+# 优先使用C加速的YAML解析器
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _empty_calendar() -> Dict:
+    """空日历数据"""
+    return {"holidays": [], "customdays": [], "studentdays": []}
+
+
+def sidecar_path(calendar_path: str) -> str:
+    """日历文件对应的编译缓存路径（同目录隐藏文件）"""
+    directory, name = os.path.split(calendar_path)
+    return os.path.join(directory, f".{name}.cache.json")
+
+
+def expand_sources(paths: Sequence[str]) -> List[str]:
+    """展开日历来源为文件列表：目录按文件名顺序展开为其中的YAML文件，重复文件只保留一次"""
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            try:
+                names = sorted(os.listdir(path))
+            except OSError as e:
+                _LOGGER.error("读取日历目录失败 %s: %s", path, e)
+                continue
+            candidates = [
+                os.path.join(path, name) for name in names
+                if not name.startswith(".") and name.endswith(CALENDAR_EXTENSIONS)
+            ]
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            resolved = os.path.realpath(candidate)
+            if resolved not in files:
+                files.append(resolved)
+    return files
+
+
+class CalendarStore:
+    """日历存储 - 每个日历文件只解析和编译一次，由所有配置条目共享
+
+    解析后的规范化事件行会写入同目录的 JSON 旁路缓存，并记录源文件的
+    mtime、大小和 SHA-1；缓存新鲜时启动和重载都不再运行 YAML 解析。
+    """
+
+    def __init__(self, calendar_path: str):
+        self.calendar_path = calendar_path
+        self.sidecar_path = sidecar_path(calendar_path)
+        self._lock = threading.RLock()
+        self._rows: Optional[List[EventRow]] = None
+        self._rules: List[RecurringRule] = []
+        self._data_cache: Optional[Dict] = None
+        self._fingerprint: Optional[tuple] = None
+        self._digest: Optional[str] = None
+        self._index: Optional[CalendarIndex] = None
+        self._index_version = -1
+        self.data_version = 0
+        self._stats = {
+            "parses_performed": 0,
+            "parses_avoided": 0,
+            "sidecar_hits": 0,
+            "sidecar_writes": 0,
+            "index_builds": 0,
+            "snapshot_restores": 0,
+        }
+        # 加载/解析、索引构建、日历事件生成等阶段耗时（所有条目共享）
+        self.perf = PerfStats()
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """获取缓存统计"""
+        return {**self._stats, "data_version": self.data_version}
+
+    @property
+    def digest(self) -> Optional[str]:
+        """当前数据对应的文件内容 SHA-1，尚未加载时为None"""
+        return self._digest
+
+    def _set_rows(self, rows: List[EventRow], rules: List[RecurringRule], data: Optional[Dict],
+                  fingerprint: Optional[tuple], digest: Optional[str]) -> None:
+        """更新规范化事件行和周期规则并递增数据版本"""
+        self._rows = rows
+        self._rules = rules
+        self._data_cache = data
+        self._fingerprint = fingerprint
+        self._digest = digest
+        self.data_version += 1
+
+    def _read_sidecar(self) -> Optional[Dict]:
+        """读取编译缓存，格式不符时返回None"""
+        try:
+            with open(self.sidecar_path, "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+            if sidecar.get("version") != SIDECAR_VERSION:
+                return None
+            sidecar["rows"] = [intern_row(row) for row in sidecar["rows"]]
+            sidecar["rules"] = [RecurringRule(*rule) for rule in sidecar["rules"]]
+            return sidecar
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+    def _write_sidecar(self, stat: os.stat_result, digest: str, rows: List[EventRow],
+                       rules: List[RecurringRule]) -> None:
+        """原子写入编译缓存，失败时忽略"""
+        sidecar = {
+            "version": SIDECAR_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha1": digest,
+            "rows": rows,
+            "rules": rules,
+        }
+        tmp_path = f"{self.sidecar_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(sidecar, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.sidecar_path)
+            self._stats["sidecar_writes"] += 1
+        except OSError as e:
+            _LOGGER.debug("写入日历编译缓存失败: %s", e)
+
+    def _refresh(self, force_reload: bool = False) -> None:
+        """按文件状态刷新事件行：内存缓存 -> 旁路缓存 -> YAML解析"""
+        try:
+            stat = os.stat(self.calendar_path)
+        except OSError:
+            # 文件不存在，保持同一份空数据，避免重复建索引
+            if self._rows is None or self._fingerprint is not None:
+                self._set_rows([], [], _empty_calendar(), None, None)
+            return
+
+        fingerprint = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if not force_reload and self._rows is not None and fingerprint == self._fingerprint:
+            self._stats["parses_avoided"] += 1
+            return
+
+        with self.perf.time("sidecar_load"):
+            sidecar = None if force_reload else self._read_sidecar()
+        if (sidecar is not None and sidecar.get("mtime_ns") == stat.st_mtime_ns
+                and sidecar.get("size") == stat.st_size):
+            # 旁路缓存与源文件状态一致，无需读取YAML
+            self._stats["sidecar_hits"] += 1
+            self._set_rows(sidecar["rows"], sidecar["rules"], None, fingerprint, sidecar.get("sha1"))
+            return
+
+        try:
+            with open(self.calendar_path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            _LOGGER.error("读取日历文件失败: %s", e)
+            if self._rows is None:
+                self._set_rows([], [], _empty_calendar(), None, None)
+            return
+
+        # 文件被touch但内容未变时不重新解析
+        digest = hashlib.sha1(raw).hexdigest()
+        if not force_reload and self._rows is not None and digest == self._digest:
+            self._fingerprint = fingerprint
+            self._stats["parses_avoided"] += 1
+            return
+        if sidecar is not None and sidecar.get("sha1") == digest:
+            self._stats["sidecar_hits"] += 1
+            self._write_sidecar(stat, digest, sidecar["rows"], sidecar["rules"])
+            self._set_rows(sidecar["rows"], sidecar["rules"], None, fingerprint, digest)
+            return
+
+        self._stats["parses_performed"] += 1
+        with self.perf.time("parse"):
+            try:
+                data = yaml.load(raw, Loader=_YAML_LOADER) or {}
+                if not isinstance(data, dict):
+                    raise ValueError("日历文件顶层必须是字典")
+                data.setdefault("holidays", [])
+                data.setdefault("customdays", [])
+                data.setdefault("studentdays", [])
+            except Exception as e:
+                _LOGGER.error("加载日历文件失败: %s", e)
+                data = _empty_calendar()
+            rows = normalize_calendar(data)
+            rules = normalize_rules(data)
+        self._write_sidecar(stat, digest, rows, rules)
+        # 不保留解析出的YAML结构（大日历下远大于事件行），需要时由 load_calendar_data 还原
+        self._set_rows(rows, rules, None, fingerprint, digest)
+
+    def load_calendar_data(self, force_reload: bool = False) -> Dict:
+        """加载日历数据 - 按文件状态（mtime/大小/inode）判断是否需要重新解析"""
+        with self._lock:
+            self._refresh(force_reload)
+            if self._data_cache is None:
+                # 来自旁路缓存时按需还原为YAML结构
+                self._data_cache = rows_to_calendar(self._rows, self._rules)
+            return self._data_cache
+
+    def load_rows(self) -> List[EventRow]:
+        """加载规范化事件行"""
+        with self._lock:
+            self._refresh()
+            return self._rows
+
+    def stat_fingerprint(self) -> Optional[tuple]:
+        """当前文件的状态指纹 (mtime_ns, 大小, inode)，文件不存在时返回None"""
+        try:
+            stat = os.stat(self.calendar_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def has_file_changed(self) -> bool:
+        """检查日历文件状态是否与已加载的数据不同"""
+        return self.stat_fingerprint() != self._fingerprint
+
+    def export_compiled(self) -> Optional[Dict]:
+        """导出已加载的编译结果（用于启动快照），尚未加载时返回None"""
+        with self._lock:
+            if self._rows is None:
+                return None
+            return {
+                "path": self.calendar_path,
+                "fingerprint": self._fingerprint,
+                "sha1": self._digest,
+                "rows": self._rows,
+                "rules": self._rules,
+            }
+
+    def seed(self, fingerprint: Optional[tuple], digest: Optional[str],
+             rows: List[EventRow], rules: List[RecurringRule]) -> None:
+        """用启动快照中的编译结果预填尚未加载的存储（指纹由调用方校验）"""
+        with self._lock:
+            if self._rows is not None:
+                return
+            data = _empty_calendar() if fingerprint is None else None
+            self._set_rows(rows, rules, data, fingerprint, digest)
+            self._stats["snapshot_restores"] += 1
+
+    def get_index(self) -> CalendarIndex:
+        """获取日历索引，仅在数据变化时重建"""
+        with self._lock:
+            rows = self.load_rows()
+            if self._index is None or self._index_version != self.data_version:
+                with self.perf.time("index_build"):
+                    self._index = CalendarIndex(rows, self._rules)
+                self._stats["index_builds"] += 1
+                self._index_version = self.data_version
+                _LOGGER.debug("日历索引已重建，共 %d 条事件、%d 条周期规则",
+                              len(self._index.rows), len(self._index.rules))
+            return self._index
+
+
+async def async_acquire_store(hass: HomeAssistant, calendar_path: str) -> CalendarStore:
+    """按解析后的真实路径获取共享存储，并增加引用计数"""
+    resolved = await hass.async_add_executor_job(os.path.realpath, calendar_path)
+    registry: Dict[str, list] = hass.data.setdefault(DATA_CALENDARS, {})
+    if resolved not in registry:
+        registry[resolved] = [CalendarStore(resolved), 0]
+        _LOGGER.debug("创建共享日历存储: %s", resolved)
+    registry[resolved][1] += 1
+    return registry[resolved][0]
+
+
+def async_release_store(hass: HomeAssistant, store: CalendarStore) -> None:
+    """释放共享存储的引用，最后一个引用释放时移除"""
+    registry: Dict[str, list] = hass.data.get(DATA_CALENDARS, {})
+    holder = registry.get(store.calendar_path)
+    if holder is None:
+        return
+    holder[1] -= 1
+    if holder[1] <= 0:
+        registry.pop(store.calendar_path)
+        _LOGGER.debug("释放共享日历存储: %s", store.calendar_path)
+
+
+class CalendarSources:
+    """多文件日历来源 - 每个文件由独立的共享存储跟踪
+
+    某个文件变化时只重新解析和索引该文件，其余文件的索引原样复用，
+    再组合为 CompositeIndex。只有一个文件时直接使用该文件的索引。
+    """
+
+    def __init__(self, hass: Optional[HomeAssistant], paths: Sequence[str],
+                 stores: Optional[List[CalendarStore]] = None):
+        self.hass = hass
+        # 配置的来源（文件或目录）
+        self.paths = list(paths)
+        self.stores: List[CalendarStore] = list(stores or [])
+        self._lock = threading.Lock()
+        self._index: Optional[Union[CalendarIndex, CompositeIndex]] = None
+        self._index_key: Optional[tuple] = None
+        self._data_cache: Optional[Dict] = None
+        self._data_parts: Optional[tuple] = None
+        self._version_key: Optional[tuple] = None
+        self._version = 0
+        # 组合索引构建和日历事件生成等阶段耗时
+        self.perf = PerfStats()
+
+    @property
+    def calendar_path(self) -> str:
+        """主日历文件路径"""
+        return self.stores[0].calendar_path if self.stores else self.paths[0]
+
+    @property
+    def data_version(self) -> int:
+        """组合数据版本，任一文件变化或文件增减时递增"""
+        key = tuple((store, store.data_version) for store in self.stores)
+        if key != self._version_key:
+            self._version_key = key
+            self._version += 1
+        return self._version
+
+    @property
+    def content_digest(self) -> str:
+        """所有来源文件内容的组合摘要（与进程无关，可用作 ETag，文件不存在时按空内容计）"""
+        return hashlib.sha1("\n".join(store.digest or "" for store in self.stores).encode()).hexdigest()
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """各文件缓存统计之和"""
+        totals: Dict[str, int] = {}
+        for store in self.stores:
+            for key, value in store.cache_stats.items():
+                if key != "data_version":
+                    totals[key] = totals.get(key, 0) + value
+        return {**totals, "files": len(self.stores), "data_version": self.data_version}
+
+    async def async_setup(self) -> None:
+        """展开来源并获取各文件的共享存储"""
+        await self.async_rescan()
+
+    async def async_rescan(self) -> bool:
+        """重新展开目录来源，获取新增文件、释放移除文件的存储；文件列表变化时返回True"""
+        files = await self.hass.async_add_executor_job(expand_sources, self.paths)
+        return await self._async_apply_files(files)
+
+    def _scan(self) -> Tuple[List[str], bool]:
+        """展开来源并检查已加载文件的状态（在executor中运行）"""
+        return expand_sources(self.paths), self.has_file_changed()
+
+    async def async_check_changes(self) -> Tuple[bool, bool]:
+        """定时检查：一次executor任务完成目录展开和文件状态检查
+
+        返回 (文件列表是否变化, 已加载的文件是否变化)。
+        """
+        files, changed = await self.hass.async_add_executor_job(self._scan)
+        return await self._async_apply_files(files), changed
+
+    async def _async_apply_files(self, files: List[str]) -> bool:
+        """按展开后的文件列表更新存储，文件列表变化时返回True"""
+        current = {store.calendar_path: store for store in self.stores}
+        if list(current) == files:
+            return False
+
+        stores = [current.get(path) or await async_acquire_store(self.hass, path) for path in files]
+        for path, store in current.items():
+            if path not in files:
+                async_release_store(self.hass, store)
+        self.stores = stores
+        _LOGGER.debug("日历来源已更新，共 %d 个文件", len(stores))
+        return True
+
+    def async_release(self) -> None:
+        """释放所有文件的共享存储"""
+        for store in self.stores:
+            async_release_store(self.hass, store)
+        self.stores = []
+
+    def has_file_changed(self) -> bool:
+        """检查是否有任一文件变化"""
+        return any(store.has_file_changed() for store in self.stores)
+
+    def load_calendar_data(self, force_reload: bool = False) -> Dict:
+        """加载合并后的日历数据（按文件顺序拼接各分类）"""
+        stores = self.stores
+        parts = [store.load_calendar_data(force_reload) for store in stores]
+        if len(parts) == 1:
+            return parts[0]
+        with self._lock:
+            cached = self._data_parts
+            if cached is None or len(cached) != len(parts) or any(a is not b for a, b in zip(cached, parts)):
+                self._data_cache = {
+                    section: [item for part in parts for item in part.get(section) or []]
+                    for section in CALENDAR_SECTIONS
+                }
+                self._data_parts = tuple(parts)
+            return self._data_cache
+
+    def get_index(self) -> Union[CalendarIndex, CompositeIndex]:
+        """获取组合索引：各文件只在自身变化时重建，组合索引在任一文件索引变化时重新组合"""
+        stores = self.stores
+        parts = [store.get_index() for store in stores]
+        if len(parts) == 1:
+            return parts[0]
+        key = tuple(parts)
+        with self._lock:
+            if self._index is None or key != self._index_key:
+                with self.perf.time("index_compose"):
+                    self._index = CompositeIndex(parts) if parts else CalendarIndex([])
+                self._index_key = key
+                _LOGGER.debug("组合日历索引已更新，共 %d 个文件", len(parts))
+            return self._index
@@ -0,0 +1,165 @@
+"""Template functions for Smart Workday - 模板函数"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import template as template_helper
+from homeassistant.util import dt
+
+from .const import DOMAIN, WorkdayState
+from .index import BuiltYearsView, YearNotBuilt, decode_state
+
+_LOGGER = logging.getLogger(__name__)
+
+# 注册为全局函数和过滤器的方法
+_FUNCTIONS = (
+    "is_workday",
+    "workday_state",
+    "next_holiday",
+    "workdays_between",
+    "add_workdays",
+    "next_workday",
+    "previous_workday",
+)
+
+
+def _to_date(value: Any) -> Optional[date]:
+    """将模板参数转换为日期：None 为今天，支持日期、日期时间和 ISO 字符串"""
+    if value is None:
+        return dt.now().date()
+    if isinstance(value, datetime):
+        return dt.as_local(value).date() if value.tzinfo else value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value)
+    return dt.parse_date(text) or (
+        parsed.date() if (parsed := dt.parse_datetime(text)) is not None else None
+    )
+
+
+class WorkdayTemplateFunctions:
+    """模板函数 - 只读协调器上次刷新时在executor中生成的年度表，可以安全地在事件循环中求值
+
+    未指定 entry_id 时使用第一个配置条目，按条目配置的假期模式判断；
+    日期无法解析、条目不存在、尚未完成首次刷新或需要查询 [今年-1, 今年+2] 以外的年份时返回 None。
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+
+    def _lookup(self, value: Any, entry_id: Optional[str]):
+        """解析 (索引只读视图, 日期)"""
+        entries = self._hass.data.get(DOMAIN, {})
+        entry = entries.get(entry_id) if entry_id else next(iter(entries.values()), None)
+        day = _to_date(value)
+        if entry is None or day is None:
+            return None, None
+        index: Optional[BuiltYearsView] = entry["coordinator"].index
+        return index, day
+
+    def workday_state(self, value: Any = None, entry_id: Optional[str] = None) -> Optional[str]:
+        """返回日期的工作日状态（workday/workday_special/holiday/holiday_custom/weekend）"""
+        index, day = self._lookup(value, entry_id)
+        if index is None:
+            return None
+        try:
+            state, _ = decode_state(index.state_code(day, index.mode))
+        except YearNotBuilt:
+            return None
+        return state.value
+
+    def is_workday(self, value: Any = None, entry_id: Optional[str] = None) -> Optional[bool]:
+        """判断日期是否为工作日（含调休上班日）"""
+        state = self.workday_state(value, entry_id)
+        if state is None:
+            return None
+        return state in (WorkdayState.WORKDAY, WorkdayState.WORKDAY_SPECIAL)
+
+    def next_holiday(self, value: Any = None, entry_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """返回日期当天或之后的第一个节假日：{date, name, days}"""
+        index, day = self._lookup(value, entry_id)
+        if index is None:
+            return None
+        try:
+            holiday = index.next_holiday(day, index.mode)
+            if holiday is None:
+                return None
+            names = dict.fromkeys(e.name for e in index.events_on(holiday))
+        except YearNotBuilt:
+            return None
+        return {
+            "date": holiday.isoformat(),
+            "name": "、".join(names),
+            "days": (holiday - day).days,
+        }
+
+    def workdays_between(self, start: Any, end: Any, entry_id: Optional[str] = None) -> Optional[int]:
+        """统计 [start, end) 内的工作日数，end 早于 start 时为负数"""
+        index, first = self._lookup(start, entry_id)
+        last = _to_date(end)
+        if index is None or last is None:
+            return None
+        try:
+            return index.workdays_between(first, last, index.mode)
+        except YearNotBuilt:
+            return None
+
+    def add_workdays(self, value: Any, days: int, entry_id: Optional[str] = None) -> Optional[str]:
+        """返回日期之后（days 为负时之前）的第 days 个工作日"""
+        index, day = self._lookup(value, entry_id)
+        if index is None:
+            return None
+        try:
+            return index.add_workdays(day, int(days), index.mode).isoformat()
+        except (YearNotBuilt, TypeError, ValueError, OverflowError):
+            # 超出已生成的年份、天数无效或结果超出公元 1-9999 年
+            return None
+
+    def next_workday(self, value: Any = None, entry_id: Optional[str] = None) -> Optional[str]:
+        """下一个工作日（不含当天）"""
+        return self.add_workdays(value, 1, entry_id)
+
+    def previous_workday(self, value: Any = None, entry_id: Optional[str] = None) -> Optional[str]:
+        """上一个工作日（不含当天）"""
+        return self.add_workdays(value, -1, entry_id)
+
+
+def _register(env: template_helper.TemplateEnvironment, functions: WorkdayTemplateFunctions) -> None:
+    """向一个模板环境注册函数、过滤器和测试"""
+    for name in _FUNCTIONS:
+        env.globals[name] = env.filters[name] = getattr(functions, name)
+    env.tests["workday"] = functions.is_workday
+
+
+def _register_environments(hass: HomeAssistant, functions: WorkdayTemplateFunctions) -> int:
+    """向 HA 缓存的非受限模板环境注册函数，返回注册的环境数
+
+    先用一次普通渲染和一次严格渲染让 HA 创建并缓存这两个环境，
+    再从 hass.data 中按类型查找（非受限环境的 states 为 AllStates），不修改 HA 的类。
+    """
+    for strict in (False, True):
+        template_helper.Template("{{ none }}", hass).async_render(strict=strict)
+    registered = 0
+    for env in list(hass.data.values()):
+        if (
+            isinstance(env, template_helper.TemplateEnvironment)
+            and env.hass is hass
+            and isinstance(env.globals.get("states"), template_helper.AllStates)
+        ):
+            _register(env, functions)
+            registered += 1
+    return registered
+
+
+@callback
+def async_setup_templates(hass: HomeAssistant) -> None:
+    """向 HA 模板环境注册函数、过滤器和测试（集成加载时调用一次）"""
+    functions = WorkdayTemplateFunctions(hass)
+    try:
+        count = _register_environments(hass, functions)
+    except (AttributeError, TypeError) as e:
+        _LOGGER.warning("无法注册模板函数，当前 HA 版本的模板环境不兼容: %s", e)
+        return
+    _LOGGER.debug("已向 %d 个模板环境注册模板函数 %s", count, " / ".join(_FUNCTIONS))
@@ -0,0 +1,219 @@
+"""Websocket API for Smart Workday - 月历网格查询与订阅"""
+
+import asyncio
+import logging
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt
+
+from .const import (
+    DOMAIN,
+    ATTR_ENTRY_ID,
+    ATTR_START_DATE,
+    ATTR_END_DATE,
+    DATA_DAY_GRID,
+    GRID_MAX_DAYS,
+    SIGNAL_CALENDAR_UPDATED,
+)
+from .coordinator import SmartWorkdayDataManager
+from .index import STATE_CODES
+
+_LOGGER = logging.getLogger(__name__)
+
+# 状态编码低3位的含义（第4位为学生假期）
+GRID_LEGEND: List[str] = [state.value for state in STATE_CODES]
+
+# 每天一项：(状态编码, 事件名称)
+DayGrid = List[Tuple[int, str]]
+
+# 按月（year + month）或按区间（start_date + end_date）查询，都不指定时为本月
+_RANGE_SCHEMA = {
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+    vol.Inclusive("year", "month"): vol.All(vol.Coerce(int), vol.Range(min=1, max=9998)),
+    vol.Inclusive("month", "month"): vol.All(vol.Coerce(int), vol.Range(min=1, max=12)),
+    vol.Inclusive(ATTR_START_DATE, "range"): cv.date,
+    vol.Inclusive(ATTR_END_DATE, "range"): cv.date,
+}
+
+
+def _date_range(msg: Dict[str, Any]) -> Tuple[date, date]:
+    """解析请求的日期区间（含首尾）"""
+    if "year" in msg:
+        year, month = msg["year"], msg["month"]
+    elif ATTR_START_DATE in msg:
+        start, end = msg[ATTR_START_DATE], msg[ATTR_END_DATE]
+        if end < start or (end - start).days >= GRID_MAX_DAYS:
+            raise ValueError(f"日期区间无效（最多 {GRID_MAX_DAYS} 天）")
+        return start, end
+    else:
+        today = dt.now().date()
+        year, month = today.year, today.month
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def grid_delta(start: date, old: DayGrid, new: DayGrid) -> Dict[str, Tuple[int, str]]:
+    """比较同一区间的两份网格，返回变化的日期 -> 新的 (状态编码, 事件名称)"""
+    first = start.toordinal()
+    return {
+        date.fromordinal(first + offset).isoformat(): day
+        for offset, (was, day) in enumerate(zip(old, new))
+        if was != day
+    }
+
+
+def _grid_payload(entry_id: str, data_manager: SmartWorkdayDataManager, start: date, end: date,
+                  grid: DayGrid) -> Dict[str, Any]:
+    """完整网格消息"""
+    return {
+        ATTR_ENTRY_ID: entry_id,
+        ATTR_START_DATE: start.isoformat(),
+        ATTR_END_DATE: end.isoformat(),
+        "mode": data_manager.holiday_mode.value,
+        "legend": GRID_LEGEND,
+        "days": grid,
+    }
+
+
+@dataclass
+class _Subscription:
+    """一个会话的网格订阅及其最近发送的网格"""
+    connection: websocket_api.ActiveConnection
+    msg_id: int
+    start: date
+    end: date
+    grid: DayGrid
+    active: bool = True
+
+
+class DayGridHub:
+    """月历网格订阅 - 日历数据或假期模式变化时，每个日期区间只计算一次，
+    各会话只收到与自己上次网格相比变化的日期
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._subscriptions: Dict[str, List[_Subscription]] = {}
+        # 订阅和推送串行执行，保证每个会话先收到完整网格，且增量按数据变化顺序发送
+        self._lock = asyncio.Lock()
+        self.stats = {"subscribed": 0, "pushes": 0, "grids_computed": 0, "days_sent": 0}
+
+    @property
+    def subscription_count(self) -> int:
+        """当前订阅数"""
+        return sum(len(subs) for subs in self._subscriptions.values())
+
+    async def async_subscribe(self, connection: websocket_api.ActiveConnection, msg_id: int, entry_id: str,
+                              data_manager: SmartWorkdayDataManager, start: date, end: date) -> None:
+        """添加订阅：先返回结果，再发送完整网格"""
+        async with self._lock:
+            grid = await self._hass.async_add_executor_job(data_manager.day_grid, start, end)
+            self.stats["grids_computed"] += 1
+            subscription = _Subscription(connection, msg_id, start, end, grid)
+            self._subscriptions.setdefault(entry_id, []).append(subscription)
+            self.stats["subscribed"] += 1
+
+            @callback
+            def _unsubscribe() -> None:
+                subscription.active = False
+                subs = self._subscriptions.get(entry_id, [])
+                if subscription in subs:
+                    subs.remove(subscription)
+                if not subs:
+                    self._subscriptions.pop(entry_id, None)
+
+            connection.subscriptions[msg_id] = _unsubscribe
+            connection.send_result(msg_id)
+            connection.send_event(msg_id, _grid_payload(entry_id, data_manager, start, end, grid))
+
+    @callback
+    def async_handle_update(self, entry_id: str, data_manager: SmartWorkdayDataManager) -> None:
+        """日历数据或假期模式变化（调度信号回调）"""
+        if self._subscriptions.get(entry_id):
+            self._hass.async_create_background_task(
+                self._async_push(entry_id, data_manager), f"{DOMAIN}_day_grid_{entry_id}"
+            )
+
+    @staticmethod
+    def _compute(data_manager: SmartWorkdayDataManager, ranges: Iterable[Tuple[date, date]]) -> Dict[Tuple[date, date], DayGrid]:
+        """在executor中计算各区间的网格"""
+        return {(start, end): data_manager.day_grid(start, end) for start, end in ranges}
+
+    async def _async_push(self, entry_id: str, data_manager: SmartWorkdayDataManager) -> None:
+        """重新计算订阅的区间，向各会话发送变化的日期"""
+        async with self._lock:
+            subscriptions = list(self._subscriptions.get(entry_id, ()))
+            if not subscriptions:
+                return
+            ranges: Set[Tuple[date, date]] = {(sub.start, sub.end) for sub in subscriptions}
+            grids = await self._hass.async_add_executor_job(self._compute, data_manager, ranges)
+            self.stats["grids_computed"] += len(grids)
+            mode = data_manager.holiday_mode.value
+            for sub in subscriptions:
+                grid = grids[(sub.start, sub.end)]
+                changed = grid_delta(sub.start, sub.grid, grid)
+                sub.grid = grid
+                if not changed or not sub.active:
+                    continue
+                sub.connection.send_event(sub.msg_id, {"mode": mode, "changed": changed})
+                self.stats["pushes"] += 1
+                self.stats["days_sent"] += len(changed)
+            _LOGGER.debug("月历网格已更新: %s，%d 个订阅、%d 个区间", entry_id, len(subscriptions), len(grids))
+
+
+def _resolve(hass: HomeAssistant, connection: websocket_api.ActiveConnection,
+             msg: Dict[str, Any]) -> Optional[Tuple[str, SmartWorkdayDataManager, date, date]]:
+    """解析 (条目ID, 数据管理器, 开始日期, 结束日期)，无效时发送错误并返回None"""
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = msg.get(ATTR_ENTRY_ID) or next(iter(entries), None)
+    if entry_id not in entries:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, f"未找到 Smart Workday 配置条目: {entry_id or '无'}")
+        return None
+    try:
+        start, end = _date_range(msg)
+    except ValueError as e:
+        connection.send_error(msg["id"], websocket_api.ERR_INVALID_FORMAT, str(e))
+        return None
+    return entry_id, entries[entry_id]["data_manager"], start, end
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/day_grid", **_RANGE_SCHEMA})
+@websocket_api.async_response
+async def websocket_day_grid(hass: HomeAssistant, connection: websocket_api.ActiveConnection,
+                             msg: Dict[str, Any]) -> None:
+    """返回某月或日期区间内每天的紧凑状态"""
+    resolved = _resolve(hass, connection, msg)
+    if resolved is None:
+        return
+    entry_id, data_manager, start, end = resolved
+    grid = await hass.async_add_executor_job(data_manager.day_grid, start, end)
+    connection.send_result(msg["id"], _grid_payload(entry_id, data_manager, start, end, grid))
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/subscribe_day_grid", **_RANGE_SCHEMA})
+@websocket_api.async_response
+async def websocket_subscribe_day_grid(hass: HomeAssistant, connection: websocket_api.ActiveConnection,
+                                       msg: Dict[str, Any]) -> None:
+    """订阅月历网格：先发送完整网格，之后日历文件或假期模式变化时只发送变化的日期"""
+    resolved = _resolve(hass, connection, msg)
+    if resolved is None:
+        return
+    entry_id, data_manager, start, end = resolved
+    hub: DayGridHub = hass.data[DATA_DAY_GRID]
+    await hub.async_subscribe(connection, msg["id"], entry_id, data_manager, start, end)
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """注册 websocket 命令和网格订阅（集成加载时调用一次）"""
+    hub = hass.data[DATA_DAY_GRID] = DayGridHub(hass)
+    async_dispatcher_connect(hass, SIGNAL_CALENDAR_UPDATED, hub.async_handle_update)
+    websocket_api.async_register_command(hass, websocket_day_grid)
+    websocket_api.async_register_command(hass, websocket_subscribe_day_grid)
@@ -0,0 +1,7 @@
+"""Test configuration for Smart Workday."""
+
+import os
+import sys
+
+# 以仓库根目录导入 custom_components
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
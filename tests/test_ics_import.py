@@ -0,0 +1,145 @@
+"""Tests for ICS import - 折行展开、DTEND 不含在内和调休映射"""
+
+from datetime import date
+from typing import List, Tuple
+
+import pytest
+
+from custom_components.smart_workday.const import HolidayMode, WorkdayState
+from custom_components.smart_workday.ics_import import event_to_row, import_ics, iter_ics_events
+from custom_components.smart_workday.index import decode_state
+from custom_components.smart_workday.store import CalendarStore
+
+# “春”的 UTF-8 编码在折行处被切断
+ICS = b"\r\n".join([
+    b"BEGIN:VCALENDAR",
+    b"VERSION:2.0",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20260215",
+    b"DTEND;VALUE=DATE:20260224",
+    b"SUMMARY:\xe6\x98",
+    b" \xa5\xe8\x8a\x82",
+    b"DESCRIPTION:first line",
+    b"\tcontinued",
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20260228",
+    b"DTEND;VALUE=DATE:20260301",
+    "SUMMARY:春节补班".encode(),
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20261001",
+    b"DTEND;VALUE=DATE:20261008",
+    "SUMMARY:国庆节".encode(),
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20261010",
+    "SUMMARY:国庆节".encode(),
+    b"CATEGORIES:Holiday,WORKDAY",
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20260928",
+    "SUMMARY:班".encode(),
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART:20260501T000000",
+    b"DTEND:20260503T000000",
+    "SUMMARY:劳动节".encode(),
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20260101",
+    b"DURATION:P2D",
+    "SUMMARY:元旦\\, 新年".encode(),
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20260312",
+    "SUMMARY:植树节".encode(),
+    b"STATUS:CANCELLED",
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20260312",
+    b"RRULE:FREQ=YEARLY",
+    "SUMMARY:植树节".encode(),
+    b"END:VEVENT",
+    b"BEGIN:VEVENT",
+    b"DTSTART;VALUE=DATE:20261001",
+    b"DTEND;VALUE=DATE:20261008",
+    "SUMMARY:国庆节".encode(),
+    b"END:VEVENT",
+    b"END:VCALENDAR",
+    b"",
+])
+
+
+def _row(start: date, end: date, section: str, name: str) -> Tuple[int, int, str, str]:
+    return start.toordinal(), end.toordinal(), section, name
+
+
+@pytest.fixture
+def ics_path(tmp_path) -> str:
+    path = tmp_path / "holidays.ics"
+    path.write_bytes(ICS)
+    return str(path)
+
+
+def _rows(path: str, section: str = "holidays") -> List[Tuple[int, int, str, str]]:
+    return [event_to_row(event, section) for event in iter_ics_events(path)]
+
+
+def test_folded_lines_are_unfolded_before_decoding(ics_path):
+    event = next(iter_ics_events(ics_path))
+    assert event["SUMMARY"][1] == "春节"
+    assert event["DESCRIPTION"][1] == "first linecontinued"
+    assert event["DTSTART"] == ({"VALUE": "DATE"}, "20260215")
+
+
+def test_dtend_is_exclusive(ics_path):
+    rows = _rows(ics_path)
+    assert rows[0] == _row(date(2026, 2, 15), date(2026, 2, 23), "holidays", "春节")
+    assert rows[2] == _row(date(2026, 10, 1), date(2026, 10, 7), "holidays", "国庆节")
+    # 定时事件在零点结束时不含结束当天
+    assert rows[5] == _row(date(2026, 5, 1), date(2026, 5, 2), "holidays", "劳动节")
+    # 没有 DTEND 时按 DURATION 计算
+    assert rows[6] == _row(date(2026, 1, 1), date(2026, 1, 2), "holidays", "元旦, 新年")
+
+
+def test_workday_events_map_to_holidays_section(ics_path):
+    rows = _rows(ics_path, section="customdays")
+    assert rows[1] == _row(date(2026, 2, 28), date(2026, 2, 28), "holidays", "春节补班（调休）")
+    assert rows[3] == _row(date(2026, 10, 10), date(2026, 10, 10), "holidays", "国庆节（调休）")
+    assert rows[4] == _row(date(2026, 9, 28), date(2026, 9, 28), "holidays", "班（调休）")
+    assert rows[2] == _row(date(2026, 10, 1), date(2026, 10, 7), "customdays", "国庆节")
+
+
+def test_cancelled_and_recurring_events_are_skipped(ics_path):
+    rows = _rows(ics_path)
+    assert rows[7] is None
+    assert rows[8] is None
+
+
+def test_import_writes_calendar_with_duplicates_removed(ics_path, tmp_path):
+    output = str(tmp_path / "imported" / "holidays.yaml")
+    existing = {_row(date(2026, 1, 1), date(2026, 1, 2), "holidays", "元旦, 新年")}
+    progress: List[Tuple[int, int, int]] = []
+
+    result = import_ics(ics_path, output, "holidays", existing, lambda *args: progress.append(args))
+
+    assert result["events_read"] == 10
+    assert result["skipped"] == 2
+    assert result["duplicates"] == 2
+    assert result["imported"] == 6
+    assert result["sections"] == {"holidays": 6, "customdays": 0, "studentdays": 0}
+    assert progress[-1] == (10, len(ICS), len(ICS))
+
+    index = CalendarStore(output).get_index()
+    states = {
+        day: decode_state(index.state_code(day, HolidayMode.STANDARD))[0]
+        for day in (date(2026, 2, 23), date(2026, 2, 24), date(2026, 10, 7), date(2026, 10, 8), date(2026, 10, 10))
+    }
+    assert states == {
+        date(2026, 2, 23): WorkdayState.HOLIDAY,
+        date(2026, 2, 24): WorkdayState.WORKDAY,
+        date(2026, 10, 7): WorkdayState.HOLIDAY,
+        date(2026, 10, 8): WorkdayState.WORKDAY,
+        date(2026, 10, 10): WorkdayState.WORKDAY_SPECIAL,
+    }
@@ -0,0 +1,156 @@
+"""Tests for the calendar index - 状态表和工作日推算与逐日 analyze_day 结果一致"""
+
+from datetime import date, timedelta
+from typing import Iterator, List
+
+import pytest
+
+from custom_components.smart_workday.const import HolidayMode, WorkdayState
+from custom_components.smart_workday.coordinator import SmartWorkdayDataManager
+from custom_components.smart_workday.index import CalendarIndex, CompositeIndex, decode_state
+
+CALENDAR = """\
+holidays:
+  - start: "2025-12-31"
+    end: "2026-01-02"
+    name: "元旦"
+  - date: "2026-01-04"
+    name: "元旦调休"
+  - start: "2026-02-15"
+    end: "2026-02-23"
+    name: "春节"
+  - date: "2026-02-28"
+    name: "春节调休"
+  - start: "2026-10-01"
+    end: "2026-10-07"
+    name: "国庆节"
+  - date: "2026-10-10"
+    name: "国庆节调休"
+  - start: "2026-12-30"
+    end: "2027-01-03"
+    name: "跨年"
+customdays:
+  - date: "2026-03-12"
+    name: "植树节"
+  - start: "2026-10-06"
+    end: "2026-10-09"
+    name: "年假"
+  - rule: weekday
+    month: 5
+    weekday: 7
+    nth: 2
+    name: "母亲节"
+  - rule: lunar
+    month: 8
+    day: 15
+    name: "中秋节"
+studentdays:
+  - start: "2026-01-20"
+    end: "2026-02-25"
+    name: "寒假"
+  - start: "2026-07-05"
+    end: "2026-08-31"
+    name: "暑假"
+"""
+
+FIRST = date(2025, 12, 1)
+LAST = date(2027, 1, 31)
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+    """[start, end] 内的每一天"""
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
+
+
+@pytest.fixture(params=list(HolidayMode), ids=lambda mode: mode.value)
+def manager(request, tmp_path) -> SmartWorkdayDataManager:
+    path = tmp_path / "calendar.yaml"
+    path.write_text(CALENDAR, encoding="utf-8")
+    data_manager = SmartWorkdayDataManager(None, str(path))
+    data_manager.update_holiday_mode(request.param)
+    return data_manager
+
+
+def _reference_workdays(manager: SmartWorkdayDataManager) -> List[date]:
+    """逐日 analyze_day 得到的工作日（含调休上班日），范围为 [FIRST, LAST]"""
+    index = manager.get_index()
+    return [day for day in _days(FIRST, LAST) if manager.analyze_day(day, index.events_on(day)).is_workday]
+
+
+def test_state_table_matches_analyze_day(manager):
+    index = manager.get_index()
+    for day in _days(FIRST, LAST):
+        info = manager.analyze_day(day, index.events_on(day))
+        assert decode_state(index.state_code(day, manager.holiday_mode)) == (info.state, info.is_student_holiday), day
+
+
+def test_states_between_spans_years(manager):
+    index = manager.get_index()
+    codes = index.states_between(FIRST, LAST, manager.holiday_mode)
+    assert len(codes) == (LAST - FIRST).days + 1
+    assert list(codes) == [index.state_code(day, manager.holiday_mode) for day in _days(FIRST, LAST)]
+
+
+def test_mode_changes_only_statutory_holidays(manager):
+    state, _ = manager.get_day_state(date(2026, 10, 2))
+    special, _ = manager.get_day_state(date(2026, 10, 10))
+    custom, _ = manager.get_day_state(date(2026, 10, 8))
+
+    expected = WorkdayState.HOLIDAY if manager.holiday_mode == HolidayMode.STANDARD else WorkdayState.WORKDAY
+    assert state == expected
+    assert special == WorkdayState.WORKDAY_SPECIAL
+    assert custom == WorkdayState.HOLIDAY_CUSTOM
+
+
+def test_workdays_between_matches_walk(manager):
+    workdays = set(_reference_workdays(manager))
+    pairs = [
+        (FIRST, LAST),
+        (date(2025, 12, 31), date(2026, 1, 5)),
+        (date(2026, 9, 28), date(2026, 10, 12)),
+        (date(2026, 12, 28), date(2027, 1, 4)),
+        (date(2026, 5, 1), date(2026, 5, 1)),
+    ]
+    for start, end in pairs:
+        expected = sum(1 for day in workdays if start <= day < end)
+        assert manager.workdays_between(start, end) == expected, (start, end)
+        assert manager.workdays_between(end, start) == -expected, (end, start)
+
+
+def test_add_workdays_matches_walk(manager):
+    workdays = _reference_workdays(manager)
+    for start in (date(2025, 12, 30), date(2026, 2, 14), date(2026, 9, 30), date(2026, 10, 10), date(2026, 12, 29)):
+        later = [day for day in workdays if day > start]
+        earlier = [day for day in workdays if day < start]
+        for count in range(1, 16):
+            assert manager.add_workdays(start, count) == later[count - 1], (start, count)
+            assert manager.add_workdays(start, -count) == earlier[-count], (start, -count)
+        assert manager.add_workdays(start, 0) == start
+        assert manager.next_workday(start) == later[0]
+        assert manager.previous_workday(start) == earlier[-1]
+
+
+def test_composite_index_matches_single_file():
+    first = date(2026, 10, 1).toordinal()
+    holiday = CalendarIndex([(first, first + 6, "holidays", "国庆节")])
+    custom = CalendarIndex([(first + 5, first + 8, "customdays", "年假")])
+    merged = CalendarIndex(holiday.rows + custom.rows)
+    composite = CompositeIndex([holiday, custom])
+
+    for mode in HolidayMode:
+        assert composite.year_flags(2026) == merged.year_flags(2026)
+        assert composite.year_states(2026, mode) == merged.year_states(2026, mode)
+        assert composite.workdays_between(date(2026, 1, 1), date(2027, 1, 1), mode) == \
+            merged.workdays_between(date(2026, 1, 1), date(2027, 1, 1), mode)
+
+
+def test_year_tables_cover_year_9999():
+    index = CalendarIndex([])
+    assert len(index.year_flags(9999)) == 365
+    assert len(index.year_flags(2028)) == 366
+    start, end = date(9999, 12, 1), date(9999, 12, 31)
+    weekdays = sum(1 for day in _days(start, end) if day < end and day.weekday() < 5)
+    assert index.workdays_between(start, end, HolidayMode.STANDARD) == weekdays
+    with pytest.raises(ValueError):
+        index.add_workdays(date(9999, 12, 31), 1, HolidayMode.STANDARD)
@@ -0,0 +1,124 @@
+"""Tests for the remote holiday source - 针对本地 HTTP 桩服务器测试远程来源同步"""
+
+import json
+import os
+from datetime import date
+from typing import Any, Dict, List
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.core import HomeAssistant
+
+from custom_components.smart_workday.const import HolidayMode, REMOTE_RETRY_MIN, WorkdayState
+from custom_components.smart_workday.index import decode_state
+from custom_components.smart_workday.remote import RemoteSource
+from custom_components.smart_workday.store import CalendarStore
+
+ETAG = '"v1"'
+DAYS = {
+    "year": 2026,
+    "days": [{"name": "国庆节", "date": f"2026-10-0{day}", "isOffDay": True} for day in range(1, 8)]
+    + [{"name": "国庆节", "date": "2026-10-10", "isOffDay": False}],
+}
+
+
+class StubServer:
+    """本地桩服务器：返回带 ETag 的 holiday-cn JSON，If-None-Match 命中时返回 304"""
+
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        app = web.Application()
+        app.router.add_get("/holidays.json", self._handle)
+        self.server = TestServer(app)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304, headers={"ETag": ETAG})
+        return web.json_response(DAYS, headers={"ETag": ETAG}, dumps=lambda d: json.dumps(d, ensure_ascii=False))
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url("/holidays.json"))
+
+
+@pytest_asyncio.fixture
+async def hass(tmp_path):
+    """最小的 HA 实例，配置目录为临时目录"""
+    instance = HomeAssistant(str(tmp_path))
+    yield instance
+    await instance.async_stop(force=True)
+
+
+@pytest_asyncio.fixture
+async def stub():
+    server = StubServer()
+    await server.server.start_server()
+    yield server
+    await server.server.close()
+
+
+@pytest_asyncio.fixture
+async def remote(hass, stub):
+    """使用注入会话的远程来源，on_change 调用记录在 remote.changes"""
+    changes: List[int] = []
+
+    async def on_change() -> None:
+        changes.append(1)
+
+    async with aiohttp.ClientSession() as session:
+        source = RemoteSource(hass, "entry", stub.url, on_change, session=session)
+        source.changes = changes
+        yield source
+        source.async_stop()
+
+
+def _state(path: str, day: date) -> WorkdayState:
+    """按同步生成的日历文件判断某天的状态"""
+    state, _ = decode_state(CalendarStore(path).get_index().state_code(day, HolidayMode.STANDARD))
+    return state
+
+
+@pytest.mark.asyncio
+async def test_sync_writes_calendar_and_etag(remote, stub):
+    result = await remote.async_sync()
+
+    assert result["status"] == "updated"
+    assert "If-None-Match" not in stub.requests[0]
+    assert remote.changes == [1]
+    assert _state(remote.output_path, date(2026, 10, 3)) == WorkdayState.HOLIDAY
+    assert _state(remote.output_path, date(2026, 10, 10)) == WorkdayState.WORKDAY_SPECIAL
+    assert remote.stats["next_sync"] is not None
+
+
+@pytest.mark.asyncio
+async def test_not_modified_revalidates_without_rewrite(remote, stub):
+    await remote.async_sync()
+    mtime = os.stat(remote.output_path).st_mtime_ns
+
+    result = await remote.async_sync()
+
+    assert result["status"] == "not_modified"
+    assert stub.requests[1]["If-None-Match"] == ETAG
+    assert remote.stats["not_modified"] == 1
+    assert remote.changes == [1]
+    assert os.stat(remote.output_path).st_mtime_ns == mtime
+
+
+@pytest.mark.asyncio
+async def test_offline_host_keeps_cache_with_backoff(remote, stub):
+    await remote.async_sync()
+    await stub.server.close()
+
+    result = await remote.async_sync()
+    assert result["status"] == "error"
+    assert remote._next_delay() == REMOTE_RETRY_MIN
+
+    await remote.async_sync()
+    assert remote._next_delay() == REMOTE_RETRY_MIN * 2
+    assert remote.stats["errors"] == 2
+    assert remote.changes == [1]
+    assert _state(remote.output_path, date(2026, 10, 3)) == WorkdayState.HOLIDAY
@@ -0,0 +1,125 @@
+"""Tests for recurring rules - 公历、星期和农历规则的展开"""
+
+from datetime import date
+from typing import Any, Dict, List
+
+import pytest
+
+from custom_components.smart_workday.const import HolidayMode, WorkdayState
+from custom_components.smart_workday.index import CalendarIndex, decode_state
+from custom_components.smart_workday.lunar import LUNAR_MAX_YEAR, lunar_month, lunar_to_ordinal
+from custom_components.smart_workday.rules import expand_rule, parse_rule, rule_to_item
+
+
+def _rule(**item: Any):
+    return parse_rule("customdays", item.pop("name", "规则"), item)
+
+
+def _starts(item: Dict[str, Any], year: int) -> List[date]:
+    """规则在某公历年内的开始日期"""
+    return [date.fromordinal(start) for start, _ in expand_rule(_rule(**item), year)]
+
+
+def test_fixed_rule_skips_feb_29_outside_leap_years():
+    item = {"rule": "fixed", "month": 2, "day": 29}
+    assert _starts(item, 2026) == []
+    assert _starts(item, 2028) == [date(2028, 2, 29)]
+
+
+@pytest.mark.parametrize(
+    ("nth", "weekday", "month", "expected"),
+    [
+        (2, 7, 5, date(2026, 5, 10)),    # 母亲节：5月第2个周日
+        (-1, 1, 5, date(2026, 5, 25)),   # 5月最后一个周一
+        (1, 7, 2, date(2026, 2, 1)),     # 月初即为周日
+        (5, 7, 2, None),                 # 2026年2月没有第5个周日
+    ],
+)
+def test_weekday_rule(nth, weekday, month, expected):
+    starts = _starts({"rule": "weekday", "month": month, "weekday": weekday, "nth": nth}, 2026)
+    assert starts == ([expected] if expected else [])
+
+
+@pytest.mark.parametrize(
+    ("year", "expected"),
+    [(2023, date(2023, 9, 29)), (2026, date(2026, 9, 25))],
+)
+def test_lunar_rule_mid_autumn(year, expected):
+    assert _starts({"rule": "lunar", "month": 8, "day": 15}, year) == [expected]
+
+
+def test_lunar_new_years_eve_counts_from_month_end():
+    # 除夕（腊月最后一天）属于上一农历年，落在下一个公历年
+    item = {"rule": "lunar", "month": 12, "day": -1}
+    assert _starts(item, 2025) == [date(2025, 1, 28)]
+    assert _starts(item, 2026) == [date(2026, 2, 16)]
+    # 腊月只有29天时 day: -1 仍是正月初一的前一天
+    for lunar_year in range(2020, 2031):
+        first, days = lunar_month(lunar_year, 12)
+        assert lunar_to_ordinal(lunar_year, 12, -1) == first + days - 1
+        assert lunar_to_ordinal(lunar_year + 1, 1, 1) == first + days
+
+
+def test_lunar_rule_ignores_leap_months():
+    # 2023年闰二月：二月、三月都按非闰月计算
+    assert _starts({"rule": "lunar", "month": 2, "day": 15}, 2023) == [date(2023, 3, 6)]
+    assert _starts({"rule": "lunar", "month": 3, "day": 1}, 2023) == [date(2023, 4, 20)]
+    # 2020年闰四月：端午仍为五月初五
+    assert _starts({"rule": "lunar", "month": 5, "day": 5}, 2020) == [date(2020, 6, 25)]
+
+
+def test_lunar_rule_skips_missing_days_and_years():
+    for lunar_year in range(2020, 2031):
+        for month in range(1, 13):
+            first, days = lunar_month(lunar_year, month)
+            if days == 29:
+                assert lunar_to_ordinal(lunar_year, month, 30) is None
+    assert _starts({"rule": "lunar", "month": 8, "day": 15}, LUNAR_MAX_YEAR + 10) == []
+
+
+def test_rule_years_and_duration():
+    item = {"rule": "fixed", "month": 12, "day": 31, "days": 3, "since": 2025, "until": 2026}
+    assert _starts(item, 2024) == []
+    assert _starts(item, 2027) == []
+    assert expand_rule(_rule(**item), 2026) == [(date(2026, 12, 31).toordinal(), date(2027, 1, 2).toordinal())]
+
+
+def test_index_carries_rule_events_into_next_year():
+    rule = _rule(rule="fixed", month=12, day=31, days=3, name="跨年假")
+    index = CalendarIndex([], [rule])
+
+    assert [e.name for e in index.events_on(date(2027, 1, 2))] == ["跨年假"]
+    assert index.events_on(date(2027, 1, 3)) == []
+    state, _ = decode_state(index.state_code(date(2027, 1, 1), HolidayMode.CUSTOM))
+    assert state == WorkdayState.HOLIDAY_CUSTOM
+
+
+def test_index_expands_lunar_rules_per_year():
+    index = CalendarIndex([], [_rule(rule="lunar", month=12, day=-1, name="除夕")])
+    assert [e.name for e in index.events_on(date(2026, 2, 16))] == ["除夕"]
+    assert [row[0] for row in index.rule_starts(2026)] == [date(2026, 2, 16).toordinal()]
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        {"rule": "yearly", "month": 1, "day": 1},
+        {"rule": "fixed", "month": 13, "day": 1},
+        {"rule": "fixed", "month": 2, "day": 30},
+        {"rule": "weekday", "month": 5, "weekday": 8, "nth": 1},
+        {"rule": "weekday", "month": 5, "weekday": 7, "nth": 0},
+        {"rule": "lunar", "month": 8, "day": 0},
+        {"rule": "lunar", "month": 8},
+        {"rule": "fixed", "month": 1, "day": 1, "since": 2026, "until": 2025},
+        {"rule": "fixed", "month": 1, "day": True},
+    ],
+)
+def test_invalid_rules_are_rejected(item):
+    with pytest.raises((ValueError, TypeError, KeyError)):
+        _rule(**item)
+
+
+def test_rule_round_trips_through_yaml_item():
+    rule = _rule(rule="weekday", month=5, weekday=7, nth=2, days=2, since=2000, name="母亲节")
+    item = rule_to_item(rule)
+    assert parse_rule(rule.section, item.pop("name"), item) == rule